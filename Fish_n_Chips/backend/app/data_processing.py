@@ -1,9 +1,14 @@
-import mne
 import numpy as np
-import pandas as pd
 import io
+import csv
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Sequence, Tuple, Union
 from fastapi import HTTPException
 
+from .edf_reader import ANNOTATION_LABEL, EDFHeader, EDFSignalReader, read_edf_header
+from .resampling import resample_polyphase
+
 REQUIRED_CHANNELS = [
     'Fp1', 'Fp2', 'F7', 'F3', 'Fz', 'F4', 'F8', 'T3',
     'C3', 'Cz', 'C4', 'T4', 'T5', 'P3', 'Pz', 'P4'
@@ -11,73 +16,172 @@ REQUIRED_CHANNELS = [
 
 TARGET_SFREQ = 256
 
-def parse_edf(file_content: bytes) -> np.ndarray:
+class ChannelResolver:
     """
-    Parses an EDF file content and returns a 2D numpy array [samples, channels].
+    Maps a file's channel labels to the column indices of REQUIRED_CHANNELS.
+
+    Devices send a small set of montage naming schemes (e.g. "EEG Fp1-REF",
+    "FP1-LE"), so the mapping is computed once per distinct label layout and
+    kept in a bounded LRU cache. Hit/miss counters are kept globally and per
+    layout so we can see which montages reach production.
     """
-    try:
-        # MNE reads from a file path, so we need to write to a temp file or use a BytesIO wrapper if supported.
-        # MNE's read_raw_edf strictly requires a filename.
-        # We will write to a temp file.
-        import tempfile
-        import os
-
-        with tempfile.NamedTemporaryFile(suffix=".edf", delete=False) as tmp:
-            tmp.write(file_content)
-            tmp_path = tmp.name
-
-        try:
-            raw = mne.io.read_raw_edf(tmp_path, preload=True, verbose=False)
-        finally:
-            os.remove(tmp_path)
-
-        # Pick channels
-        # MNE channel names might be case sensitive or have extra labels (e.g. "EEG Fp1-REF")
+
+    def __init__(self, required_channels: Sequence[str] = REQUIRED_CHANNELS, maxsize: int = 64):
+        self.required_channels = list(required_channels)
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Tuple[str, ...], List[int]]" = OrderedDict()
+        self._layout_hits: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, channel_names: Sequence[str]) -> List[int]:
+        """
+        Return the index of each required channel in channel_names (training order).
+        Raises HTTPException(400) if a required channel is missing.
+        """
+        key = tuple(channel_names)
+        with self._lock:
+            indices = self._cache.get(key)
+            if indices is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                self._layout_hits[key] += 1
+                return list(indices)
+            self.misses += 1
+
+        indices = self._match(key)
+
+        with self._lock:
+            self._cache[key] = indices
+            self._layout_hits.setdefault(key, 0)
+            while len(self._cache) > self.maxsize:
+                evicted, _ = self._cache.popitem(last=False)
+                self._layout_hits.pop(evicted, None)
+        return list(indices)
+
+    def _match(self, channel_names: Tuple[str, ...]) -> List[int]:
+        # EDF channel names might be case sensitive or have extra labels (e.g. "EEG Fp1-REF")
         # We need a robust matching strategy.
-        available_channels = raw.ch_names
-        picked_channels = []
+        available_channels = [
+            name if name != ANNOTATION_LABEL else "" for name in channel_names
+        ]
+        lowered = [name.lower() for name in available_channels]
+        picked_indices = []
 
-        for req_ch in REQUIRED_CHANNELS:
+        for req_ch in self.required_channels:
             # Try exact match
             if req_ch in available_channels:
-                picked_channels.append(req_ch)
+                picked_indices.append(available_channels.index(req_ch))
                 continue
 
             # Try case-insensitive or substring match
             # This is a heuristic; might need refinement based on actual data
-            match = None
-            for av_ch in available_channels:
-                if req_ch.lower() in av_ch.lower():
-                    match = av_ch
-                    break
-
-            if match:
-                picked_channels.append(match)
+            req_lower = req_ch.lower()
+            match = next((idx for idx, av_ch in enumerate(lowered) if av_ch and req_lower in av_ch), None)
+
+            if match is not None:
+                picked_indices.append(match)
             else:
                 raise HTTPException(status_code=400, detail=f"Missing required channel: {req_ch}")
 
-        raw.pick_channels(picked_channels)
+        return picked_indices
+
+    def stats(self) -> Dict:
+        """Cache counters plus the resolved labels and hit count of each cached layout."""
+        with self._lock:
+            layouts = [
+                {
+                    "channels": [key[i] for i in indices],
+                    "n_channels_in_file": len(key),
+                    "hits": self._layout_hits.get(key, 0)
+                }
+                for key, indices in self._cache.items()
+            ]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "layouts": layouts
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._layout_hits.clear()
+            self.hits = 0
+            self.misses = 0
+
+channel_resolver = ChannelResolver()
+
+def read_edf_layout(file_content: Union[bytes, memoryview]) -> Tuple[EDFHeader, List[int]]:
+    """
+    Parses the EDF header and maps its labels to the REQUIRED_CHANNELS indices.
+
+    Cheap (header bytes only), so the app calls it in its own process: the
+    channel_resolver cache and counters then see every upload.
+    """
+    try:
+        header = read_edf_header(file_content)
+        # Pick channels (mapping cached per header layout)
+        return header, channel_resolver.resolve(header.labels)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing EDF file: {str(e)}")
+
+def decode_edf(file_content: Union[bytes, memoryview], header: EDFHeader, picked_indices: Sequence[int]) -> np.ndarray:
+    """
+    Decodes the picked channels (training order) into a 2D float32 numpy array
+    [samples, channels] at TARGET_SFREQ. The CPU-heavy half of parse_edf.
+    """
+    try:
+        # Channels are read per sampling rate (usually one group) and each group resampled on its own
+        groups: Dict[int, List[int]] = {}
+        for col, index in enumerate(picked_indices):
+            groups.setdefault(header.signals[index].samples_per_record, []).append(col)
+
+        parts = []
+        for cols in groups.values():
+            # Lazily decode this group's channels
+            reader = EDFSignalReader(file_content, header, [picked_indices[col] for col in cols])
 
-        # Reorder channels to match training order
-        raw.reorder_channels(picked_channels) # pick_channels might preserve order, but let's be safe if we mapped them
+            # Resample if necessary (polyphase, chunk by chunk straight from the records)
+            if reader.sfreq != TARGET_SFREQ:
+                parts.append((cols, resample_polyphase(reader, reader.sfreq, TARGET_SFREQ)))
+            else:
+                parts.append((cols, reader[:]))
 
-        # Resample if necessary
-        if raw.info['sfreq'] != TARGET_SFREQ:
-            raw.resample(TARGET_SFREQ)
+        if len(parts) == 1:
+            return parts[0][1]
 
-        # Get data
-        data, times = raw.get_data(return_times=True)
-        # data is [channels, samples], we need [samples, channels]
-        return data.T
+        # Mixed rates: same duration, so lengths differ at most by rounding
+        n_samples = min(len(data) for _, data in parts)
+        eeg_data = np.empty((n_samples, len(picked_indices)), dtype=np.float32)
+        for cols, data in parts:
+            eeg_data[:, cols] = data[:n_samples]
+        return eeg_data
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing EDF file: {str(e)}")
 
+def parse_edf(file_content: Union[bytes, memoryview]) -> np.ndarray:
+    """
+    Parses an EDF file content and returns a 2D float32 numpy array [samples, channels].
+
+    The upload is parsed in memory and only the REQUIRED_CHANNELS are decoded.
+    Channels recorded at different sampling rates are each resampled to
+    TARGET_SFREQ (mne resampled them too), so mixed-rate files are accepted.
+    """
+    header, picked_indices = read_edf_layout(file_content)
+    return decode_edf(file_content, header, picked_indices)
+
 def parse_csv(file_content: str) -> np.ndarray:
     """
     Parses a CSV string and returns a 2D numpy array.
     Assumes columns are channels and rows are timepoints.
     """
+    import pandas as pd
+
     try:
         df = pd.read_csv(io.StringIO(file_content))
 
@@ -93,3 +197,159 @@ def parse_csv(file_content: str) -> np.ndarray:
         return df.values
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing CSV file: {str(e)}")
+
+# Rows parsed per chunk by the streaming CSV reader
+CSV_CHUNK_ROWS = 65536
+
+def _read_csv_header(stream: BinaryIO) -> List[str]:
+    line = stream.readline()
+    if not line:
+        raise ValueError("Empty CSV file")
+    return [name.strip() for name in next(csv.reader([line.decode("utf-8-sig")]))]
+
+def parse_csv_stream(stream: BinaryIO, chunk_rows: int = CSV_CHUNK_ROWS) -> np.ndarray:
+    """
+    Streams a CSV upload into a float32 array [samples, 16] without buffering the file.
+
+    The column layout is validated from the header line alone: 16 columns are
+    taken as-is, otherwise the REQUIRED_CHANNELS are selected by name. Rows are
+    parsed in chunks by pandas' C engine with a fixed float32 dtype and copied
+    into a preallocated buffer that grows geometrically.
+    """
+    import pandas as pd
+
+    try:
+        columns = _read_csv_header(stream)
+
+        # Basic validation: check if we have 16 columns
+        if len(columns) == 16:
+            usecols = list(range(16))
+        elif all(ch in columns for ch in REQUIRED_CHANNELS):
+            # Select by name, in training order
+            usecols = [columns.index(ch) for ch in REQUIRED_CHANNELS]
+        else:
+            raise HTTPException(status_code=400, detail=f"CSV must have 16 channels. Found {len(columns)}")
+
+        reader = pd.read_csv(
+            stream,
+            header=None,
+            names=list(range(len(columns))),
+            usecols=usecols,
+            dtype=np.float32,
+            engine="c",
+            chunksize=chunk_rows
+        )
+
+        buffer = np.empty((chunk_rows, len(usecols)), dtype=np.float32)
+        n_rows = 0
+        for chunk in reader:
+            values = chunk[usecols].to_numpy(dtype=np.float32, copy=False)
+            if n_rows + len(values) > buffer.shape[0]:
+                grown = np.empty((max(2 * buffer.shape[0], n_rows + len(values)), buffer.shape[1]), dtype=np.float32)
+                grown[:n_rows] = buffer[:n_rows]
+                buffer = grown
+            buffer[n_rows:n_rows + len(values)] = values
+            n_rows += len(values)
+
+        if buffer.shape[0] - n_rows > chunk_rows:
+            # Release the geometric over-allocation (up to 2x) instead of returning a view that keeps it alive
+            return buffer[:n_rows].copy()
+        return buffer[:n_rows]
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing CSV file: {str(e)}")
+
+# Content types accepted by /predict besides JSON
+RAW_FLOAT32_CONTENT_TYPES = ("application/octet-stream", "application/x-float32")
+NPY_CONTENT_TYPE = "application/x-npy"
+ARROW_CONTENT_TYPES = ("application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.file")
+BINARY_CONTENT_TYPES = RAW_FLOAT32_CONTENT_TYPES + (NPY_CONTENT_TYPE,) + ARROW_CONTENT_TYPES
+
+def _parse_shape_header(shape_header: str) -> Tuple[int, ...]:
+    try:
+        shape = tuple(int(dim) for dim in shape_header.replace("x", ",").split(",") if dim.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid X-EEG-Shape header: {shape_header!r}")
+    if len(shape) not in (1, 2) or any(dim <= 0 for dim in shape):
+        raise HTTPException(status_code=400, detail="X-EEG-Shape must be 'samples,channels' or 'channels'")
+    return shape
+
+def _parse_raw_float32(body: memoryview, shape_header: str) -> np.ndarray:
+    if not shape_header:
+        raise HTTPException(status_code=400, detail="Raw float32 bodies require an X-EEG-Shape header")
+    shape = _parse_shape_header(shape_header)
+    if len(body) % 4:
+        raise HTTPException(status_code=400, detail="Raw float32 body length must be a multiple of 4 bytes")
+
+    data = np.frombuffer(body, dtype="<f4")
+    if len(shape) == 1:
+        # Only the channel count was given
+        shape = (-1, shape[0])
+    try:
+        return data.reshape(shape)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Body of {data.size} floats does not match shape {shape}")
+
+def _parse_npy(body: memoryview) -> np.ndarray:
+    # Parse the .npy header ourselves so the payload is wrapped, not copied (np.load copies)
+    header_stream = io.BytesIO(body[:min(len(body), 65536 + 12)])
+    try:
+        version = np.lib.format.read_magic(header_stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header_stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header_stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid .npy body: {e}")
+
+    if dtype.hasobject:
+        raise HTTPException(status_code=400, detail="Object arrays are not accepted")
+
+    count = int(np.prod(shape))
+    try:
+        data = np.frombuffer(body, dtype=dtype, count=count, offset=header_stream.tell())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid .npy body: {e}")
+    return data.reshape(shape, order="F" if fortran_order else "C")
+
+def _parse_arrow(body: memoryview) -> np.ndarray:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow IPC bodies require pyarrow to be installed")
+
+    try:
+        reader = pa.ipc.open_stream(body) if body[:6] != b"ARROW1" else pa.ipc.open_file(body)
+        table = reader.read_all()
+    except pa.ArrowInvalid as e:
+        raise HTTPException(status_code=400, detail=f"Invalid Arrow IPC body: {e}")
+
+    # One column per channel; select REQUIRED_CHANNELS by name when present
+    if table.num_columns != 16 and all(ch in table.column_names for ch in REQUIRED_CHANNELS):
+        table = table.select(REQUIRED_CHANNELS)
+
+    data = np.empty((table.num_rows, table.num_columns), dtype=np.float32)
+    for col in range(table.num_columns):
+        data[:, col] = table.column(col).to_numpy()
+    return data
+
+def parse_binary_eeg(body: Union[bytes, memoryview], content_type: str, shape_header: str = "") -> np.ndarray:
+    """
+    Turns a binary /predict body into a [samples, channels] array without
+    per-element validation.
+
+    Supports raw little-endian float32 (shape from the X-EEG-Shape header),
+    .npy and Arrow IPC (stream or file) bodies.
+    """
+    body = memoryview(body)
+    content_type = content_type.split(";")[0].strip().lower()
+
+    if content_type == NPY_CONTENT_TYPE or (
+        content_type in RAW_FLOAT32_CONTENT_TYPES and bytes(body[:6]) == b"\x93NUMPY"
+    ):
+        return _parse_npy(body)
+    if content_type in RAW_FLOAT32_CONTENT_TYPES:
+        return _parse_raw_float32(body, shape_header)
+    if content_type in ARROW_CONTENT_TYPES:
+        return _parse_arrow(body)
+
+    raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
@@ -1,19 +1,115 @@
-from sqlalchemy import create_engine
+"""
+Database engines and sessions.
+
+Routers use AsyncSession (get_async_db) so queries and commits do not block
+the event loop; the sync Session (get_db) remains for scripts, data export and
+init_db. Both engines share the same connection settings:
+
+- SQLite: WAL journal (readers never block the writer), synchronous=NORMAL,
+  memory-mapped reads, a busy timeout instead of immediate "database is
+  locked" errors, and a small pool without overflow: writes are serialized by
+  SQLite anyway, and waiting in the pool queue is cheaper than SQLite's
+  sleep-and-retry busy handler (extra connections only add lock contention).
+- Server databases (PostgreSQL): a larger pool with pre-ping and recycling.
+
+Configuration (environment):
+    DATABASE_URL                sync URL (default sqlite:///./cogni_safe.db)
+    ASYNC_DATABASE_URL          async URL (default derived: sqlite+aiosqlite / postgresql+asyncpg)
+    DB_POOL_SIZE                pooled connections (default 5 for SQLite, 10 otherwise)
+    DB_MAX_OVERFLOW             extra connections under bursts (default 0 for SQLite, 20 otherwise)
+    DB_POOL_TIMEOUT             seconds to wait for a pooled connection (default 30)
+    DB_POOL_RECYCLE             seconds before a server connection is replaced (default 1800)
+    SQLITE_BUSY_TIMEOUT_MS      how long a writer waits for the lock (default 5000)
+    SQLITE_MMAP_SIZE            bytes of the file memory-mapped for reads (default 256 MB)
+    SQLITE_CACHE_SIZE_KB        page cache per connection (default 16 MB)
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 import os
 
 # Database URL - using SQLite for simplicity
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./cogni_safe.db")
 
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 16384))
+
+# (pool_size, max_overflow) per backend
+POOL_DEFAULTS = {
+    "sqlite": (5, 0),
+    "default": (10, 20),
+}
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def is_sqlite_memory(url: str) -> bool:
+    return is_sqlite(url) and (url.split("///", 1)[-1] in ("", ":memory:") or "mode=memory" in url)
+
+def async_url(url: str) -> str:
+    """Async driver URL for a sync DATABASE_URL (aiosqlite for SQLite, asyncpg for PostgreSQL)."""
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme and scheme.split("+", 1)[1] in ("aiosqlite", "asyncpg"):
+        return url
+    backend = scheme.split("+", 1)[0]
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if backend in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    raise ValueError(f"No async driver configured for '{scheme}'; set ASYNC_DATABASE_URL")
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+def engine_options(url: str, asynchronous: bool = False) -> dict:
+    """Pool and connect arguments for `url`, sized per backend."""
+    if is_sqlite_memory(url):
+        # One shared connection, or every session would see its own empty database
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    backend = "sqlite" if is_sqlite(url) else "default"
+    pool_size, max_overflow = POOL_DEFAULTS[backend]
+    options = {
+        "poolclass": AsyncAdaptedQueuePool if asynchronous else QueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+    }
+    if backend == "sqlite":
+        options["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if not asynchronous:
+            options["connect_args"]["check_same_thread"] = False
+    else:
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    return options
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning, applied on connect (sync and aiosqlite connections)."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, asynchronous=True))
 
-# Create session factory
+if is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", set_sqlite_pragmas)
+if is_sqlite(ASYNC_DATABASE_URL):
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit (no implicit refresh, which async cannot do lazily)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -25,3 +121,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async DB session (routers)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,193 @@
+"""
+Minimal in-memory EDF/EDF+ reader.
+
+Parses the header and data records straight from the uploaded bytes (or a
+memoryview) and only decodes the requested signals, so uploads never touch
+the filesystem and unused channels are never converted to floats.
+"""
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple, Union
+
+BufferLike = Union[bytes, bytearray, memoryview]
+
+# Physical dimension -> scale to volts (same convention as mne.io.read_raw_edf)
+UNIT_SCALES = {
+    "v": 1.0,
+    "mv": 1e-3,
+    "uv": 1e-6,
+    "µv": 1e-6,
+    "μv": 1e-6,
+    "nv": 1e-9,
+}
+
+ANNOTATION_LABEL = "EDF Annotations"
+
+@dataclass
+class EDFSignal:
+    label: str
+    physical_dimension: str
+    physical_min: float
+    physical_max: float
+    digital_min: int
+    digital_max: int
+    samples_per_record: int
+    offset: int  # Sample offset of this signal inside one data record
+
+    @property
+    def gain(self) -> float:
+        return (self.physical_max - self.physical_min) / (self.digital_max - self.digital_min)
+
+    @property
+    def unit_scale(self) -> float:
+        return UNIT_SCALES.get(self.physical_dimension.strip().lower(), 1.0)
+
+@dataclass
+class EDFHeader:
+    header_bytes: int
+    n_records: int
+    record_duration: float
+    signals: List[EDFSignal]
+    record_samples: int  # Total int16 samples per data record (all signals)
+
+    @property
+    def labels(self) -> List[str]:
+        return [s.label for s in self.signals]
+
+    def sfreq(self, index: int) -> float:
+        return self.signals[index].samples_per_record / self.record_duration
+
+def _field(buf: memoryview, start: int, width: int) -> str:
+    return bytes(buf[start:start + width]).decode("latin-1").strip()
+
+def _number(value: str, name: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid EDF header field {name}: {value!r}")
+
+def read_edf_header(content: BufferLike) -> EDFHeader:
+    """
+    Parse the fixed and per-signal EDF header fields.
+    """
+    buf = memoryview(content)
+    if len(buf) < 256:
+        raise ValueError("File too small to be an EDF file")
+
+    header_bytes = int(_number(_field(buf, 184, 8), "header bytes"))
+    n_records = int(_number(_field(buf, 236, 8), "number of data records"))
+    record_duration = _number(_field(buf, 244, 8), "data record duration")
+    ns = int(_number(_field(buf, 252, 4), "number of signals"))
+
+    if header_bytes != 256 * (ns + 1) or len(buf) < header_bytes:
+        raise ValueError("Corrupt EDF header")
+    if record_duration <= 0:
+        raise ValueError("EDF data record duration must be positive")
+
+    # Per-signal fields are stored field-major: all labels, then all transducers, ...
+    widths = [16, 80, 8, 8, 8, 8, 8, 80, 8, 32]
+    columns = []
+    pos = 256
+    for width in widths:
+        columns.append([_field(buf, pos + i * width, width) for i in range(ns)])
+        pos += width * ns
+    labels, _, dims, pmins, pmaxs, dmins, dmaxs, _, nsamps, _ = columns
+
+    signals = []
+    offset = 0
+    for i in range(ns):
+        samples_per_record = int(_number(nsamps[i], "samples per record"))
+        signals.append(EDFSignal(
+            label=labels[i],
+            physical_dimension=dims[i],
+            physical_min=_number(pmins[i], "physical minimum"),
+            physical_max=_number(pmaxs[i], "physical maximum"),
+            digital_min=int(_number(dmins[i], "digital minimum")),
+            digital_max=int(_number(dmaxs[i], "digital maximum")),
+            samples_per_record=samples_per_record,
+            offset=offset
+        ))
+        offset += samples_per_record
+
+    record_samples = offset
+    available_records = (len(buf) - header_bytes) // (record_samples * 2) if record_samples else 0
+    # n_records is -1 while recording; truncated uploads only keep complete records
+    if n_records < 0 or n_records > available_records:
+        n_records = available_records
+
+    return EDFHeader(
+        header_bytes=header_bytes,
+        n_records=n_records,
+        record_duration=record_duration,
+        signals=signals,
+        record_samples=record_samples
+    )
+
+class EDFSignalReader:
+    """
+    Lazy [samples, channels] view over selected EDF signals.
+
+    Slicing rows (reader[a:b]) decodes only the data records covering that range
+    into float32 volts, so callers can process long recordings chunk by chunk.
+    All selected signals must share the same sampling rate.
+    """
+
+    def __init__(self, content: BufferLike, header: EDFHeader, indices: Sequence[int]):
+        if not indices:
+            raise ValueError("No EDF signals selected")
+
+        rates = {header.signals[i].samples_per_record for i in indices}
+        if len(rates) != 1:
+            raise ValueError("Selected EDF signals have different sampling rates")
+
+        self.header = header
+        self.signals = [header.signals[i] for i in indices]
+        self.samples_per_record = rates.pop()
+        self.sfreq = self.samples_per_record / header.record_duration
+
+        # Zero-copy int16 view of all data records: [n_records, record_samples]
+        self._records = np.frombuffer(
+            content, dtype="<i2",
+            count=header.n_records * header.record_samples,
+            offset=header.header_bytes
+        ).reshape(header.n_records, header.record_samples)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.header.n_records * self.samples_per_record, len(self.signals)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        if not isinstance(rows, slice) or rows.step not in (None, 1):
+            raise TypeError("EDFSignalReader only supports contiguous row slices")
+        start, stop, _ = rows.indices(len(self))
+        stop = max(start, stop)
+
+        spr = self.samples_per_record
+        first_record = start // spr
+        last_record = -(-stop // spr)
+        trim = start - first_record * spr
+        records = self._records[first_record:last_record]
+
+        data = np.empty((stop - start, len(self.signals)), dtype=np.float32)
+        for col, sig in enumerate(self.signals):
+            digital = records[:, sig.offset:sig.offset + spr].reshape(-1)[trim:trim + stop - start]
+            # physical = (digital - dig_min) * gain + phys_min, scaled to volts
+            physical = (digital.astype(np.float64) - sig.digital_min) * sig.gain + sig.physical_min
+            data[:, col] = physical * sig.unit_scale
+
+        return data
+
+def read_edf_signals(content: BufferLike, header: EDFHeader, indices: Sequence[int]) -> Tuple[np.ndarray, float]:
+    """
+    Decode only the selected signals into a float32 array [samples, channels] in volts.
+
+    All selected signals must share the same sampling rate.
+
+    Returns:
+        (data, sfreq)
+    """
+    reader = EDFSignalReader(content, header, indices)
+    return reader[:], reader.sfreq
@@ -0,0 +1,235 @@
+"""
+Off-event-loop execution for blocking request stages.
+
+CPU-bound stages (EDF parsing, EEG features, librosa analysis) run in a bounded
+process pool; I/O-bound or in-process stages (sklearn predict on the loaded
+model, streaming CSV reads, SQLite session-store writes) run in a thread pool.
+Async stages await work that already has its own workers (Whisper, in the
+transcription pool) on the event loop, so waiting for it holds no I/O thread.
+Each stage has its own queue-depth limit: when it is saturated the request is
+rejected with 429 instead of piling up, and queue wait vs execution time is
+recorded per stage.
+
+Worker processes are started from a fork server rather than forked from the
+app: the app runs background warm-up threads (see startup.py) and forking
+while one of them holds an import or library lock can deadlock the child.
+The fork server preloads the CPU stage modules once, so workers start warm;
+each worker then designs the resampling filters for the common device rates
+(_init_cpu_worker), since the taps are cached per process.
+A process pool whose worker died (e.g. killed by the OOM killer) is broken for
+good; it is replaced and the call retried once, then the request gets 503.
+
+Configuration (environment):
+    CPU_WORKERS, IO_WORKERS          pool sizes
+    CPU_START_METHOD                 worker start method (default forkserver where available)
+    MAX_PENDING_<STAGE>              queue-depth limit, e.g. MAX_PENDING_EEG_FEATURES=32
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException
+
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", os.cpu_count() or 2))
+IO_WORKERS = int(os.getenv("IO_WORKERS", 16))
+CPU_START_METHOD = os.getenv(
+    "CPU_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Imported once by the fork server so CPU workers do not each pay for them
+CPU_PRELOAD = [
+    "scipy.signal",
+    "backend.app.feature_extraction",
+    "backend.app.data_processing",
+    "backend.app.services.speech.audio_pipeline",
+]
+
+# Default queue-depth limit (in-flight + queued requests) per stage
+STAGE_LIMITS = {
+    "eeg_upload": ("io", 32),
+    "eeg_parse": ("cpu", 32),
+    "eeg_features": ("cpu", 64),
+    "eeg_predict": ("io", 64),
+    "speech_transcribe": ("async", 32),
+    "speech_align": ("io", 16),
+    "speech_features": ("cpu", 32),
+    "speech_linguistic": ("io", 32),
+    "speech_score": ("io", 64),
+    "speech_session": ("io", 64),
+}
+
+class RemoteHTTPError(Exception):
+    """Picklable stand-in for HTTPException raised inside a worker process."""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def _init_cpu_worker():
+    from backend.app.data_processing import TARGET_SFREQ
+    from backend.app.resampling import warm_filter_cache
+    warm_filter_cache(TARGET_SFREQ)
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Runs in the worker; returns (result, wall-clock start, execution seconds)."""
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    except HTTPException as e:
+        raise RemoteHTTPError(e.status_code, e.detail)
+    return result, started_at, time.perf_counter() - start
+
+class StageMetrics:
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+
+    def record(self, queue_wait: float, exec_time: float):
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.exec_total += exec_time
+        self.exec_max = max(self.exec_max, exec_time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        done = self.completed or 1
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "queue_wait_avg_ms": round(self.queue_wait_total / done * 1000, 3),
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 3),
+            "exec_avg_ms": round(self.exec_total / done * 1000, 3),
+            "exec_max_ms": round(self.exec_max * 1000, 3),
+        }
+
+class Stage:
+    """
+    A named pipeline stage bound to the CPU (process) or I/O (thread) pool, or
+    an async stage whose fn is a coroutine function awaited on the event loop.
+    """
+
+    def __init__(self, name: str, kind: str, max_pending: int):
+        self.name = name
+        self.kind = kind
+        self.max_pending = max_pending
+        self.metrics = StageMetrics()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) off the event loop (async stages: await it).
+        Raises HTTPException(429) when the stage queue is full.
+        For process stages fn and its arguments must be picklable.
+        """
+        metrics = self.metrics
+        if metrics.in_flight >= self.max_pending:
+            metrics.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail=f"Server busy ({self.name} queue full), retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        metrics.submitted += 1
+        metrics.in_flight += 1
+        submitted_at = time.time()
+        try:
+            if self.kind == "async":
+                # No stage queue: the wait is all execution (including fn's own queueing)
+                started_at = submitted_at
+                start = time.perf_counter()
+                result = await fn(*args, **kwargs)
+                exec_time = time.perf_counter() - start
+            else:
+                result, started_at, exec_time = await self._run_in_pool(fn, args, kwargs)
+        except RemoteHTTPError as e:
+            metrics.failed += 1
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except Exception:
+            metrics.failed += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+
+        metrics.record(max(0.0, started_at - submitted_at), exec_time)
+        return result
+
+    async def _run_in_pool(self, fn: Callable, args: tuple, kwargs: dict):
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = _get_pool(self.kind)
+            try:
+                return await loop.run_in_executor(pool, _timed_call, fn, args, kwargs)
+            except BrokenProcessPool:
+                _discard_pool(self.kind, pool)
+                if attempt:
+                    raise HTTPException(
+                        status_code=503,
+                        detail=f"{self.name} worker crashed, retry shortly",
+                        headers={"Retry-After": "1"}
+                    )
+                print(f"⚠️ {self.name}: process pool broken, restarting it and retrying")
+
+_pools: Dict[str, Any] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(kind: str):
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            if kind == "cpu":
+                context = multiprocessing.get_context(CPU_START_METHOD)
+                if CPU_START_METHOD == "forkserver":
+                    context.set_forkserver_preload(CPU_PRELOAD)
+                pool = ProcessPoolExecutor(max_workers=CPU_WORKERS, mp_context=context, initializer=_init_cpu_worker)
+            else:
+                pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io-stage")
+            _pools[kind] = pool
+        return pool
+
+def _discard_pool(kind: str, pool):
+    """Drop a broken pool so the next _get_pool starts a fresh one (unless another call already did)."""
+    with _pools_lock:
+        if _pools.get(kind) is pool:
+            del _pools[kind]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+STAGES: Dict[str, Stage] = {
+    name: Stage(name, kind, int(os.getenv(f"MAX_PENDING_{name.upper()}", limit)))
+    for name, (kind, limit) in STAGE_LIMITS.items()
+}
+
+def get_stage(name: str) -> Stage:
+    return STAGES[name]
+
+def executor_metrics() -> Dict[str, Any]:
+    return {
+        "pools": {"cpu_workers": CPU_WORKERS, "io_workers": IO_WORKERS},
+        "stages": {
+            name: {"kind": stage.kind, "max_pending": stage.max_pending, **stage.metrics.to_dict()}
+            for name, stage in STAGES.items()
+        }
+    }
+
+def shutdown_executors(wait: bool = True):
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        _pools.clear()
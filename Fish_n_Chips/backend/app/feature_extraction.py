@@ -1,7 +1,9 @@
 import numpy as np
-import pandas as pd
-from scipy.signal import welch
-from typing import List, Dict, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Union, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Frequency bands
 BANDS = {
@@ -24,6 +26,8 @@ def compute_bandpower(data: np.ndarray, fs: int, method: str = 'welch') -> Dict[
     Returns:
         Dictionary of bandpowers.
     """
+    from scipy.signal import welch  # deferred: scipy.signal is slow to import
+
     # Compute PSD
     freqs, psd = welch(data, fs, nperseg=fs*2) # 2 second window for Welch
 
@@ -47,45 +51,124 @@ def compute_bandpower(data: np.ndarray, fs: int, method: str = 'welch') -> Dict[
 
     return bandpowers
 
-def extract_features_from_segment(segment: np.ndarray, fs: int = 256, channel_names: List[str] = None) -> np.ndarray:
+# Band order used in the feature vector (keys sorted alphabetically, as in training)
+FEATURE_BANDS = sorted(BANDS.keys())
+
+# Features per channel: mean, std, skew, kurtosis + abs/rel power for each band
+N_FEATURES_PER_CHANNEL = 4 + 2 * len(FEATURE_BANDS)
+
+# Windows per extract_features_batch call in extract_window_features (bounds peak memory)
+WINDOW_BLOCK = 128
+
+@lru_cache(maxsize=32)
+def _band_masks(fs: int, nperseg: int) -> Tuple[np.ndarray, float]:
     """
-    Extract features from a multi-channel EEG segment.
+    Precompute the boolean band-mask matrix for a given Welch configuration.
+
+    Returns:
+        (masks, freq_res) where masks is [n_bands, n_freqs] in FEATURE_BANDS order.
+    """
+    freqs = np.fft.rfftfreq(nperseg, d=1.0 / fs)
+    masks = np.array([
+        np.logical_and(freqs >= BANDS[band][0], freqs <= BANDS[band][1])
+        for band in FEATURE_BANDS
+    ])
+    masks.setflags(write=False)
+    return masks, float(freqs[1] - freqs[0])
+
+def features_from_moments(mean: np.ndarray, m2: np.ndarray, m3: np.ndarray, m4: np.ndarray,
+                          n_samples: int, psd: np.ndarray, fs: int, nperseg: int) -> np.ndarray:
+    """
+    Assemble the feature vector from central moments and a Welch PSD.
 
     Args:
-        segment: 2D array [n_samples, n_channels]
+        mean, m2, m3, m4: Mean and biased central moments, each [..., n_channels]
+        n_samples: Number of samples the moments were computed over
+        psd: Welch PSD [..., n_freqs, n_channels]
         fs: Sampling rate
-        channel_names: List of channel names (optional, for structured return if needed)
+        nperseg: Welch segment length used for psd
 
     Returns:
-        1D feature vector.
+        Feature array [..., n_channels * N_FEATURES_PER_CHANNEL]
+    """
+    # Time domain stats (pandas semantics: unbiased skew, excess kurtosis, 0 for flat signals)
+    std = np.sqrt(m2)
+    flat = m2 * n_samples < 1e-14
+    safe_m2 = np.where(flat, 1.0, m2)
+    g1 = m3 / safe_m2 ** 1.5
+    g2 = m4 / safe_m2 ** 2 - 3.0
+    n = float(n_samples)
+    skewness = np.where(flat, 0.0, g1 * np.sqrt(n * (n - 1)) / (n - 2))
+    kurt = np.where(flat, 0.0, ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3)))
+
+    # Integral approximation (sum * resolution) for all bands at once
+    masks, freq_res = _band_masks(fs, nperseg)
+    abs_power = np.einsum('bf,...fc->...cb', masks.astype(psd.dtype), psd) * freq_res
+    total_power = abs_power.sum(axis=-1, keepdims=True)
+    rel_power = np.divide(abs_power, total_power, out=np.zeros_like(abs_power), where=total_power > 0)
+
+    # Per channel: mean, std, skew, kurt, then <band>_abs, <band>_rel per sorted band
+    band_features = np.stack([abs_power, rel_power], axis=-1).reshape(abs_power.shape[:-1] + (-1,))
+    features = np.concatenate([
+        np.stack([mean, std, skewness, kurt], axis=-1),
+        band_features
+    ], axis=-1)
+
+    return features.reshape(features.shape[:-2] + (-1,))
+
+def extract_features_batch(segments: np.ndarray, fs: int = 256) -> np.ndarray:
+    """
+    Vectorized feature extraction over one or more multi-channel segments.
+
+    Welch, the moments and the band powers are computed in a single pass along
+    the samples axis instead of looping over channels.
+
+    Args:
+        segments: Array [..., n_samples, n_channels] (e.g. [n_windows, n_samples, n_channels])
+        fs: Sampling rate
+
+    Returns:
+        Feature array [..., n_channels * N_FEATURES_PER_CHANNEL], in the same
+        order as the per-channel loop used for training.
     """
-    n_samples, n_channels = segment.shape
+    from scipy.signal import welch
 
-    features = []
+    segments = np.asarray(segments, dtype=np.float64)
+    n_samples = segments.shape[-2]
 
-    # Per-channel features
-    for ch in range(n_channels):
-        ch_data = segment[:, ch]
+    # Central moments along the samples axis
+    mean = np.mean(segments, axis=-2)
+    dev = segments - mean[..., np.newaxis, :]
+    dev2 = dev * dev
+    m2 = np.mean(dev2, axis=-2)
+    m3 = np.mean(dev2 * dev, axis=-2)
+    m4 = np.mean(dev2 * dev2, axis=-2)
 
-        # Time domain stats
-        features.append(np.mean(ch_data))
-        features.append(np.std(ch_data))
-        features.append(pd.Series(ch_data).skew())
-        features.append(pd.Series(ch_data).kurtosis())
+    # Frequency domain features - one Welch call for every channel (2 second window)
+    nperseg = min(fs * 2, n_samples)
+    _, psd = welch(segments, fs, nperseg=nperseg, axis=-2)  # [..., n_freqs, n_channels]
+
+    return features_from_moments(mean, m2, m3, m4, n_samples, psd, fs, nperseg)
+
+def extract_features_from_segment(segment: np.ndarray, fs: int = 256, channel_names: List[str] = None) -> np.ndarray:
+    """
+    Extract features from a multi-channel EEG segment.
 
-        # Frequency domain features
-        bp = compute_bandpower(ch_data, fs)
-        # Order: delta_abs, theta_abs, ..., delta_rel, ...
-        # We sort by keys to be deterministic
-        for key in sorted(bp.keys()):
-            features.append(bp[key])
+    Args:
+        segment: 2D array [n_samples, n_channels]
+        fs: Sampling rate
+        channel_names: List of channel names (optional, for structured return if needed)
 
-    # Global features (ratios, etc.) - Simplified for now
-    # TODO: Add cross-channel features if needed
+    Returns:
+        1D feature vector.
+    """
+    segment = np.asarray(segment)
+    if segment.ndim != 2:
+        raise ValueError("Segment must be a 2D array [samples, channels]")
 
-    return np.array(features)
+    return extract_features_batch(segment, fs=fs)
 
-def segment_data(df: pd.DataFrame, window_size_sec: int = 4, step_size_sec: int = 2, fs: int = 256):
+def segment_data(df: "pd.DataFrame", window_size_sec: int = 4, step_size_sec: int = 2, fs: int = 256):
     """
     Generator that yields segments of data.
     """
@@ -98,3 +181,40 @@ def segment_data(df: pd.DataFrame, window_size_sec: int = 4, step_size_sec: int
         end = start + window_size_samples
         segment = df.iloc[start:end]
         yield segment
+
+def sliding_windows(data: np.ndarray, window_size_sec: int = 4, step_size_sec: int = 2, fs: int = 256) -> np.ndarray:
+    """
+    Zero-copy sliding windows over a continuous recording.
+
+    Args:
+        data: 2D array [n_samples, n_channels]
+        window_size_sec: Window length in seconds
+        step_size_sec: Step between window starts in seconds
+        fs: Sampling rate
+
+    Returns:
+        Strided view [n_windows, window_size_samples, n_channels] (same windows as segment_data).
+    """
+    window_size_samples = window_size_sec * fs
+    step_size_samples = step_size_sec * fs
+
+    if data.shape[0] < window_size_samples:
+        return np.empty((0, window_size_samples, data.shape[1]), dtype=data.dtype)
+
+    # sliding_window_view puts the window axis last: [n_starts, n_channels, window]
+    windows = np.lib.stride_tricks.sliding_window_view(data, window_size_samples, axis=0)
+    return windows[::step_size_samples].transpose(0, 2, 1)
+
+def extract_window_features(data: np.ndarray, window_size_sec: int = 4, step_size_sec: int = 2, fs: int = 256) -> np.ndarray:
+    """
+    Feature matrix [n_windows, n_features] for every sliding window of a recording.
+
+    Windows are processed WINDOW_BLOCK at a time, so the float64 temporaries of
+    extract_features_batch stay bounded however long the recording is.
+    """
+    windows = sliding_windows(data, window_size_sec, step_size_sec, fs)
+    n_windows, _, n_channels = windows.shape
+    features = np.empty((n_windows, n_channels * N_FEATURES_PER_CHANNEL))
+    for start in range(0, n_windows, WINDOW_BLOCK):
+        features[start:start + WINDOW_BLOCK] = extract_features_batch(windows[start:start + WINDOW_BLOCK], fs=fs)
+    return features
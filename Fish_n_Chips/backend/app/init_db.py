@@ -3,12 +3,16 @@ Initialize the database tables.
 Run this script once to create the database schema.
 """
 from database import engine, Base
-from models.db_models import SpeechTestResult, SentenceRecording, CognitiveGameSession, GameAttempt, EEGTestResult
+from models.db_models import SpeechTestResult, SentenceRecording, CognitiveGameSession, GameAttempt, EEGTestResult, UnifiedAssessment
 
 def init_db():
     """Create all tables in the database"""
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables; add indexes introduced since they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("✅ Database tables created successfully!")
     print(f"Database location: cogni_safe.db")
 
@@ -1,6 +1,8 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket
+from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-import joblib
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 import numpy as np
 import os
 import asyncio
@@ -10,12 +12,30 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from .schemas import EEGSampleRequest, PredictionResponse, SaveEEGResultRequest
-from .feature_extraction import extract_features_from_segment
-from .data_processing import parse_edf, parse_csv
+from .schemas import (
+    EEGSampleRequest, PredictionResponse, SaveEEGResultRequest,
+    WindowPrediction, WindowedPredictionResponse
+)
+from .feature_extraction import extract_features_from_segment, extract_window_features, sliding_windows
+from .data_processing import (
+    read_edf_layout, decode_edf, parse_csv_stream, parse_binary_eeg, channel_resolver,
+    BINARY_CONTENT_TYPES, TARGET_SFREQ
+)
+from .streaming import StreamingFeatureExtractor, decode_sample_frame
+from .visualization import encode_viz_frame, ENCODINGS, MAX_POINTS
+from .executors import get_stage, executor_metrics, shutdown_executors
+from .startup import (
+    register_component, warm_up, mark_app_imported, liveness, readiness, startup_report
+)
 from backend.app.routers import speech_analysis, cognitive_games, unified_analysis
-from backend.app.database import get_db
-from sqlalchemy.orm import Session
+from backend.app.services.speech.whisper_service import (
+    warm_transcription_pool, get_transcription_pool, shutdown_transcription_pool
+)
+from backend.app.services.speech.speech_scorer import get_ml_model
+from backend.app.services.speech.linguistic_service import linguistic_service
+from backend.app.services.speech.stimulus_aligner import alignment_available, get_aligner
+from backend.app.database import get_async_db, async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
 # ... (existing code) ...
@@ -29,25 +49,53 @@ from fastapi import Depends
 model = None
 scaler = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Load model on startup
-    global model, scaler
+def load_eeg_model():
+    global model
+    import joblib
     model_path = os.path.join("models", "eeg_best_model.joblib")
     # scaler_path = os.path.join("models", "eeg_scaler.joblib") # If scaler is separate
 
-    try:
-        # Check if model exists (it might not if notebooks haven't run)
-        if os.path.exists(model_path):
-            model = joblib.load(model_path)
-            print(f"Model loaded from {model_path}")
-        else:
-            print(f"Warning: Model not found at {model_path}. Inference will fail.")
+    # Check if model exists (it might not if notebooks haven't run)
+    if not os.path.exists(model_path):
+        print(f"Warning: Model not found at {model_path}. Inference will fail.")
+        raise FileNotFoundError(model_path)
+    model = joblib.load(model_path)
+    print(f"Model loaded from {model_path}")
+    return model
+
+def warm_eeg_dsp():
+    # scipy.signal and pandas are imported on first use. Resampling filters are
+    # designed in the CPU workers, which do the resampling (executors._init_cpu_worker)
+    import scipy.signal  # noqa: F401
+    import pandas  # noqa: F401
+
+def load_transcription():
+    pool = warm_transcription_pool()
+    if not pool.wait_ready():
+        raise RuntimeError(f"transcription backend '{pool.backend_name}' failed to load")
+    return pool
+
+# Loaded on first use or by the background warm-up, whichever comes first.
+# Required components gate /health/ready.
+EEG_MODEL = register_component("eeg_model", load_eeg_model)
+register_component("eeg_dsp", warm_eeg_dsp, required=False)
+register_component("transcription", load_transcription)
+register_component("speech_model", get_ml_model, required=False)
+register_component("spacy", lambda: linguistic_service.nlp, required=False)
+if alignment_available():
+    register_component("stimulus_aligner", lambda: get_aligner().load(), required=False)
 
-    except Exception as e:
-        print(f"Error loading model: {e}")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Models load in the background; the app serves /health/live right away
+    warm_up()
 
     yield
+
+    # Stop worker pools
+    shutdown_executors(wait=False)
+    shutdown_transcription_pool()
+    await async_engine.dispose()
     # Clean up if needed
 
 app = FastAPI(title="CogniSafe EEG Screener", lifespan=lifespan)
@@ -66,7 +114,20 @@ app.add_middleware(
 )
 
 @app.websocket("/ws/simulate")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    viz: str = "json",
+    points: int = 256,
+    encoding: str = "int16",
+    delta: bool = False
+):
+    """
+    Simulated live feed.
+
+    viz=json (default) embeds the raw chunk in each JSON message. viz=binary sends
+    the prediction as JSON followed by a binary frame (see visualization.py) of
+    `points` min/max-decimated rows, int16 or float16, optionally delta encoded.
+    """
     await websocket.accept()
     try:
         # Simulate a session
@@ -76,6 +137,16 @@ async def websocket_endpoint(websocket: WebSocket):
         fs = 256
         window_size = 4 * fs # 4 seconds
         n_channels = 16
+        seq = 0
+
+        binary_viz = viz == "binary"
+        if binary_viz:
+            if not 2 <= points <= MAX_POINTS:
+                await websocket.send_text(json.dumps({"error": f"points must be between 2 and {MAX_POINTS}"}))
+                return
+            if encoding not in ENCODINGS or (delta and encoding != "int16"):
+                await websocket.send_text(json.dumps({"error": f"encoding must be one of {ENCODINGS}; delta requires int16"}))
+                return
 
         while True:
             # Generate dummy chunk (replace with real file reading logic if needed)
@@ -86,32 +157,35 @@ async def websocket_endpoint(websocket: WebSocket):
             # Run inference on this chunk
             # We need to handle the potential errors gracefully inside the loop
             try:
-                features = extract_features_from_segment(chunk, fs=fs)
+                features = await get_stage("eeg_features").run(extract_features_from_segment, chunk, fs)
                 features_reshaped = features.reshape(1, -1)
 
+                await EEG_MODEL.ensure_async()
                 if model:
-                    status_class = int(model.predict(features_reshaped)[0])
-                    probability = float(model.predict_proba(features_reshaped)[0][1])
-
-                    if probability < 0.3:
-                        risk_level = "Low"
-                    elif probability < 0.7:
-                        risk_level = "Medium"
-                    else:
-                        risk_level = "High"
+                    status_class, probability = await get_stage("eeg_predict").run(predict_single, features_reshaped)
+                    risk_level = get_risk_level(probability)
 
                     response = {
                         "timestamp": np.random.randint(0, 10000), # Mock timestamp
                         "status_class": status_class,
                         "probability": probability,
-                        "risk_level": risk_level,
-                        "raw_chunk": chunk.tolist() # Send raw data for visualization (careful with size)
+                        "risk_level": risk_level
                     }
 
-                    await websocket.send_text(json.dumps(response))
+                    if binary_viz:
+                        # Decimated samples follow as a separate binary message
+                        response["frame_seq"] = seq
+                        await websocket.send_text(json.dumps(response))
+                        await websocket.send_bytes(encode_viz_frame(chunk, seq, points, encoding, delta))
+                        seq += 1
+                    else:
+                        response["raw_chunk"] = chunk.tolist() # Send raw data for visualization (careful with size)
+                        await websocket.send_text(json.dumps(response))
                 else:
                     await websocket.send_text(json.dumps({"error": "Model not loaded"}))
 
+            except HTTPException as he:
+                await websocket.send_text(json.dumps({"error": he.detail}))
             except Exception as e:
                 await websocket.send_text(json.dumps({"error": str(e)}))
 
@@ -124,12 +198,113 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.close()
 
 
+@app.websocket("/ws/stream")
+async def stream_endpoint(websocket: WebSocket, hop_sec: int = 1):
+    """
+    Live EEG stream from a device.
+
+    The client sends binary frames of interleaved little-endian float32 samples
+    [n_samples, 16] at 256 Hz. Once 4 s are buffered, a prediction is sent every
+    hop_sec seconds, computed incrementally from the new samples only.
+    """
+    await websocket.accept()
+    try:
+        fs = 256
+        n_channels = 16
+
+        try:
+            extractor = StreamingFeatureExtractor(n_channels=n_channels, fs=fs, hop_sec=hop_sec)
+        except ValueError as e:
+            await websocket.send_text(json.dumps({"error": str(e)}))
+            return
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            frame = message.get("bytes")
+            if frame is None:
+                await websocket.send_text(json.dumps({"error": "Send binary float32 sample frames"}))
+                continue
+
+            samples = decode_sample_frame(frame, n_channels)
+            if samples is None:
+                await websocket.send_text(json.dumps({"error": f"Frame size must be a multiple of {4 * n_channels} bytes"}))
+                continue
+
+            updates = extractor.push(samples)
+            if not updates:
+                continue
+
+            await EEG_MODEL.ensure_async()
+            if not model:
+                await websocket.send_text(json.dumps({"error": "Model not loaded"}))
+                continue
+
+            # Score every hop completed by this frame in one call
+            try:
+                probabilities = await get_stage("eeg_predict").run(
+                    model.predict_proba, np.stack([features for _, features in updates])
+                )
+            except HTTPException as he:
+                await websocket.send_text(json.dumps({"error": he.detail}))
+                continue
+            status_classes = model.classes_[np.argmax(probabilities, axis=1)]
+
+            for (end_sample, _), status_class, proba in zip(updates, status_classes, probabilities):
+                probability = float(proba[1])
+                await websocket.send_text(json.dumps({
+                    "timestamp": end_sample / fs,  # Seconds since stream start (window end)
+                    "status_class": int(status_class),
+                    "probability": probability,
+                    "risk_level": get_risk_level(probability)
+                }))
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"WebSocket error: {e}")
+    finally:
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass  # Already closed by the client
+
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "model_loaded": model is not None}
+    return {"status": "healthy", "model_loaded": model is not None, **readiness()}
+
+@app.get("/health/live")
+def health_live():
+    """Liveness: the process is serving requests (models may still be loading)"""
+    return liveness()
+
+@app.get("/health/ready")
+def health_ready():
+    """Readiness: 503 until every required component has loaded"""
+    status = readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/health/startup")
+def health_startup():
+    """App import time and per-component load timings"""
+    return startup_report()
+
+@app.get("/metrics/executors")
+def executors_metrics():
+    """Per-stage queue depth, rejections, queue wait vs execution time"""
+    return {**executor_metrics(), "transcription": get_transcription_pool().stats()}
+
+def get_risk_level(probability: float) -> str:
+    if probability < 0.3:
+        return "Low"
+    elif probability < 0.7:
+        return "Medium"
+    return "High"
 
-def run_inference(eeg_data: np.ndarray, fs: int):
+def validate_eeg_input(eeg_data: np.ndarray):
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
@@ -140,57 +315,186 @@ def run_inference(eeg_data: np.ndarray, fs: int):
     if eeg_data.shape[1] != 16:
         raise HTTPException(status_code=400, detail=f"EEG data must have 16 channels. Got {eeg_data.shape[1]}")
 
-    # Extract features
-    features = extract_features_from_segment(eeg_data, fs=fs)
+def predict_single(features_reshaped: np.ndarray):
+    """(status_class, probability) for one feature row; runs on the eeg_predict thread stage."""
+    status_class = int(model.predict(features_reshaped)[0])
+    probability = float(model.predict_proba(features_reshaped)[0][1])
+    return status_class, probability
+
+async def run_inference(eeg_data: np.ndarray, fs: int):
+    await EEG_MODEL.ensure_async()
+    validate_eeg_input(eeg_data)
+
+    # Extract features (process pool)
+    features = await get_stage("eeg_features").run(extract_features_from_segment, eeg_data, fs)
 
     # Reshape for prediction (1, n_features)
     features_reshaped = features.reshape(1, -1)
 
-    # Predict
-    status_class = int(model.predict(features_reshaped)[0])
-    probability = float(model.predict_proba(features_reshaped)[0][1])
-
-    # Determine risk level
-    if probability < 0.3:
-        risk_level = "Low"
-    elif probability < 0.7:
-        risk_level = "Medium"
-    else:
-        risk_level = "High"
+    # Predict (thread pool, the model lives in this process)
+    status_class, probability = await get_stage("eeg_predict").run(predict_single, features_reshaped)
 
     return PredictionResponse(
         status_class=status_class,
         probability=probability,
-        risk_level=risk_level,
+        risk_level=get_risk_level(probability),
         model_version="v1.0"
     )
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict_eeg(request: EEGSampleRequest):
+async def run_windowed_inference(eeg_data: np.ndarray, fs: int, window_size_sec: int = 4, step_size_sec: int = 2):
+    """
+    Score every sliding window of a recording with a single predict_proba call.
+    """
+    await EEG_MODEL.ensure_async()
+    validate_eeg_input(eeg_data)
+
+    n_windows = sliding_windows(eeg_data, window_size_sec, step_size_sec, fs).shape[0]
+    if n_windows == 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Recording shorter than one {window_size_sec}s window ({eeg_data.shape[0] / fs:.2f}s)"
+        )
+
+    # [n_windows, n_features] feature matrix, scored in one batch
+    features = await get_stage("eeg_features").run(
+        extract_window_features, eeg_data, window_size_sec, step_size_sec, fs
+    )
+    probabilities = await get_stage("eeg_predict").run(model.predict_proba, features)
+    status_classes = model.classes_[np.argmax(probabilities, axis=1)]
+    risk_probabilities = probabilities[:, 1]
+
+    window_results = [
+        WindowPrediction(
+            start_sec=i * step_size_sec,
+            end_sec=i * step_size_sec + window_size_sec,
+            status_class=int(status_classes[i]),
+            probability=float(risk_probabilities[i]),
+            risk_level=get_risk_level(float(risk_probabilities[i]))
+        )
+        for i in range(n_windows)
+    ]
+
+    # Aggregate over the whole recording
+    mean_probability = float(np.mean(risk_probabilities))
+
+    return WindowedPredictionResponse(
+        n_windows=n_windows,
+        window_size_sec=window_size_sec,
+        step_size_sec=step_size_sec,
+        windows=window_results,
+        aggregate=PredictionResponse(
+            status_class=int(mean_probability >= 0.5),
+            probability=mean_probability,
+            risk_level=get_risk_level(mean_probability),
+            model_version="v1.0"
+        ),
+        max_probability=float(np.max(risk_probabilities)),
+        high_risk_fraction=float(np.mean(risk_probabilities >= 0.7))
+    )
+
+@app.post(
+    "/predict",
+    response_model=PredictionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": EEGSampleRequest.model_json_schema()},
+                **{
+                    content_type: {"schema": {"type": "string", "format": "binary"}}
+                    for content_type in BINARY_CONTENT_TYPES
+                },
+            },
+        }
+    },
+)
+async def predict_eeg(request: Request):
+    """
+    JSON body ({"eeg": [[...]], "sampling_rate": 256}) or a binary body:
+    raw little-endian float32 (X-EEG-Shape: samples,channels), .npy or Arrow IPC.
+    Binary bodies take the sampling rate from the X-Sampling-Rate header.
+    """
     try:
-        eeg_data = np.array(request.eeg)
-        return run_inference(eeg_data, request.sampling_rate)
+        content_type = request.headers.get("content-type", "application/json")
+        body = await request.body()
+
+        if content_type.split(";")[0].strip().lower() in BINARY_CONTENT_TYPES:
+            eeg_data = parse_binary_eeg(body, content_type, request.headers.get("x-eeg-shape", ""))
+            rate_header = request.headers.get("x-sampling-rate", "256")
+            try:
+                sampling_rate = int(rate_header)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid X-Sampling-Rate header: {rate_header!r}")
+            if sampling_rate <= 0:
+                raise HTTPException(status_code=400, detail="X-Sampling-Rate must be a positive integer")
+        else:
+            try:
+                sample = EEGSampleRequest.model_validate(json.loads(body))
+            except json.JSONDecodeError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+            except ValidationError as e:
+                raise RequestValidationError(
+                    [{**err, "loc": ("body",) + tuple(err["loc"])} for err in e.errors()]
+                )
+            eeg_data = np.array(sample.eeg)
+            sampling_rate = sample.sampling_rate
+
+        return await run_inference(eeg_data, sampling_rate)
+    except (HTTPException, RequestValidationError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def read_eeg_upload(file: UploadFile):
+    """
+    Parse an uploaded .edf/.csv file into [samples, channels] and its sampling rate.
+    """
+    filename = file.filename.lower()
+
+    if filename.endswith(".edf"):
+        content = await file.read()
+        # Header and channel mapping here, where channel_resolver's cache and counters live;
+        # only the sample decode and resampling go to the process pool
+        header, picked_indices = read_edf_layout(content)
+        eeg_data = await get_stage("eeg_parse").run(decode_edf, content, header, picked_indices)
+        # EDFs usually have their own fs, but decode_edf resamples to 256
+        fs = 256
+    elif filename.endswith(".csv"):
+        # Stream the spooled upload in chunks instead of decoding it to one string
+        await file.seek(0)
+        eeg_data = await get_stage("eeg_upload").run(parse_csv_stream, file.file)
+        fs = 256 # Assumption for CSVs unless specified otherwise
+    else:
+        raise HTTPException(status_code=400, detail="Unsupported file format. Use .csv or .edf")
+
+    return eeg_data, fs
+
 @app.post("/predict_file", response_model=PredictionResponse)
 async def predict_file(file: UploadFile = File(...)):
     try:
-        contents = await file.read()
-        filename = file.filename.lower()
-
-        if filename.endswith(".edf"):
-            eeg_data = parse_edf(contents)
-            # EDFs usually have their own fs, but parse_edf resamples to 256
-            fs = 256
-        elif filename.endswith(".csv"):
-            # Decode bytes to string for CSV
-            eeg_data = parse_csv(contents.decode('utf-8'))
-            fs = 256 # Assumption for CSVs unless specified otherwise
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format. Use .csv or .edf")
+        eeg_data, fs = await read_eeg_upload(file)
+        return await run_inference(eeg_data, fs)
 
-        return run_inference(eeg_data, fs)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict_file/windows", response_model=WindowedPredictionResponse)
+async def predict_file_windows(
+    file: UploadFile = File(...),
+    window_size_sec: int = 4,
+    step_size_sec: int = 2
+):
+    """
+    Per-window predictions (4s windows, 2s step by default) plus an aggregate for long recordings.
+    """
+    try:
+        if window_size_sec <= 0 or step_size_sec <= 0:
+            raise HTTPException(status_code=400, detail="window_size_sec and step_size_sec must be positive")
+
+        eeg_data, fs = await read_eeg_upload(file)
+        return await run_windowed_inference(eeg_data, fs, window_size_sec, step_size_sec)
 
     except HTTPException as he:
         raise he
@@ -198,10 +502,16 @@ async def predict_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/eeg/channel_stats")
+def channel_stats():
+    """EDF channel-layout cache counters (which montages reach production)"""
+    return channel_resolver.stats()
+
+
 @app.post("/api/eeg/save_result")
 async def save_eeg_result(
     request: SaveEEGResultRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save EEG test result to database"""
     try:
@@ -233,10 +543,12 @@ async def save_eeg_result(
         )
 
         db.add(eeg_result)
-        db.commit()
-        db.refresh(eeg_result)
+        await unified_analysis.refresh_assessment(db, request.user_id)
+        await db.commit()
 
         return {"success": True, "id": eeg_result.id}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+mark_app_imported()
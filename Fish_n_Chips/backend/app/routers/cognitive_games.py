@@ -2,18 +2,20 @@
 API endpoints for cognitive games
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 import random
 from typing import List
 
-from backend.app.database import get_db
+from backend.app.database import get_async_db
 from backend.app.models.game_schemas import (
     GameStartRequest, GameStartResponse,
     GameSubmitRequest, GameResultResponse,
     CognitiveGamesResultsResponse
 )
 from backend.app.models.db_models import CognitiveGameSession, GameAttempt
+from backend.app.routers.unified_analysis import refresh_assessment
 
 router = APIRouter(
     prefix="/api/games",
@@ -46,7 +48,7 @@ PATTERN_RECOGNITION_CONFIG = {
 }
 
 @router.post("/start", response_model=GameStartResponse)
-async def start_game(request: GameStartRequest, db: Session = Depends(get_db)):
+async def start_game(request: GameStartRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Start a new cognitive game session
     """
@@ -87,7 +89,7 @@ async def start_game(request: GameStartRequest, db: Session = Depends(get_db)):
         game_config=game_config
     )
     db.add(db_session)
-    db.commit()
+    await db.commit()
 
     return GameStartResponse(
         session_id=session_id,
@@ -97,14 +99,14 @@ async def start_game(request: GameStartRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/submit", response_model=GameResultResponse)
-async def submit_game(request: GameSubmitRequest, db: Session = Depends(get_db)):
+async def submit_game(request: GameSubmitRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Submit game results and calculate scores
     """
     # Get session
-    session = db.query(CognitiveGameSession).filter(
+    session = await db.scalar(select(CognitiveGameSession).where(
         CognitiveGameSession.session_id == request.session_id
-    ).first()
+    ))
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -179,7 +181,8 @@ async def submit_game(request: GameSubmitRequest, db: Session = Depends(get_db))
     session.executive_function_score = cognitive_metrics.get("executive_function_score")
     session.processing_speed_score = cognitive_metrics.get("processing_speed_score")
 
-    db.commit()
+    await refresh_assessment(db, session.user_id)
+    await db.commit()
 
     return GameResultResponse(
         session_id=request.session_id,
@@ -193,14 +196,14 @@ async def submit_game(request: GameSubmitRequest, db: Session = Depends(get_db))
 
 
 @router.get("/results/{user_id}", response_model=CognitiveGamesResultsResponse)
-async def get_user_results(user_id: str, db: Session = Depends(get_db)):
+async def get_user_results(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get aggregated cognitive games results for a user
     """
-    sessions = db.query(CognitiveGameSession).filter(
+    sessions = (await db.scalars(select(CognitiveGameSession).where(
         CognitiveGameSession.user_id == user_id,
         CognitiveGameSession.completed == True
-    ).all()
+    ))).all()
 
     if not sessions:
         raise HTTPException(status_code=404, detail="No completed games found")
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends
 from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import uuid
+import re
+import asyncio
 import shutil
 import os
 import tempfile
@@ -10,28 +14,37 @@ from datetime import datetime
 
 from backend.app.models.schemas import (
     SpeechTestRequest, SpeechTestResponse,
-    SpeechAnalysisResponse, PauseLocation, SpeechFeatures,
+    SpeechAnalysisResponse, PauseLocation, SpeechFeatures, WordTiming,
     AudiometryRequest, AudiometryResponse, SpeechResultsResponse
 )
 
-from backend.app.services.speech.whisper_service import transcribe_with_timestamps
-from backend.app.services.speech.vad_service import detect_speech_start
-from backend.app.services.speech.feature_extractor import extract_acoustic_features, extract_linguistic_features
-from backend.app.services.speech.pause_analyzer import analyze_pauses
+from backend.app.services.speech.whisper_service import (
+    transcribe_with_timestamps, ERROR_RESULT, TRANSCRIPTION_BACKEND, WHISPER_MODEL
+)
+from backend.app.services.speech.vad_service import VAD_FRAME_MS, VAD_SMOOTHING_MS
+from backend.app.services.speech.feature_extractor import PITCH_ENGINE
+from backend.app.services.speech.linguistic_service import extract_linguistic_features, linguistic_service
+from backend.app.services.speech.audio_pipeline import analyze_audio, decode_audio
+from backend.app.services.speech.analysis_cache import analysis_cache
+from backend.app.services.speech.stimulus_aligner import (
+    align_to_stimulus, alignment_available, ALIGN_BUNDLE, ALIGN_MIN_CONFIDENCE
+)
+from backend.app.services.speech.pause_analyzer import analyze_pauses, PAUSE_ERROR_RESULT
 from backend.app.services.speech.audiometry_service import adaptive_threshold_test
 from backend.app.services.speech.speech_scorer import calculate_ml_risk_score
+from backend.app.services.speech.session_aggregates import new_aggregates, add_sentence, summarize
+from backend.app.services.session_store import speech_sessions, audiometry_sessions
 from backend.app.utils.audio_utils import convert_audio_format
-from backend.app.database import get_db
+from backend.app.database import get_db, get_async_db
+from backend.app.executors import get_stage
 from backend.app.models.db_models import SpeechTestResult, SentenceRecording
+from backend.app.routers.unified_analysis import refresh_assessment
 
 router = APIRouter(
     prefix="/api/speech",
     tags=["speech"]
 )
 
-# In-memory session store (replace with DB in production)
-sessions = {}
-
 STIMULUS_SENTENCES = [
     "There sits an old man",
     "The cat is on the mat",
@@ -41,14 +54,117 @@ STIMULUS_SENTENCES = [
     "Today is a beautiful day"
 ]
 
+# Tag the stimulus sentences (and their aligned, lower-case form) in one batch when spaCy loads
+linguistic_service.register_warm_texts(
+    STIMULUS_SENTENCES + [" ".join(re.findall(r"[a-z']+", s.lower())) for s in STIMULUS_SENTENCES]
+)
+
+# Settings that change cached results (part of the cache key)
+TRANSCRIPTION_VARIANT = f"{TRANSCRIPTION_BACKEND}/{WHISPER_MODEL}"
+MIN_SILENCE_DURATION = 0.3
+VAD_VARIANT = f"{VAD_FRAME_MS}/{VAD_SMOOTHING_MS}"
+
+def match_stimulus(sentence: str) -> Optional[str]:
+    """The known stimulus sentence matching the client's text (case/punctuation-insensitive)."""
+    key = sentence.lower().strip(" .,!?")
+    for stimulus in STIMULUS_SENTENCES:
+        if stimulus.lower() == key:
+            return stimulus
+    return None
+
+def word_timings(words) -> list:
+    """ASR word objects or aligned word dicts -> [{"word", "start", "end", "score"}]."""
+    timings = []
+    for w in words or []:
+        get = w.get if isinstance(w, dict) else lambda key, default=None: getattr(w, key, default)
+        timings.append({
+            "word": str(get("word", "")).strip(),
+            "start": float(get("start", 0.0)),
+            "end": float(get("end", 0.0)),
+            "score": get("score")
+        })
+    return timings
+
+def pause_label(pause: dict, timings: list, index: int) -> str:
+    """The last word that ends before the pause starts (50 ms tolerance)."""
+    before = [t["word"] for t in timings if t["end"] <= pause["start"] + 0.05]
+    return before[-1] if before else f"pause_{index + 1}"
+
+async def transcribe_and_analyze(audio_path: str, stimulus_sentence: str):
+    """
+    Transcription, acoustic features, pause analysis and VAD speech onset for
+    one clip, served from the content-addressed cache where possible; only
+    missing parts run.
+
+    For the known stimulus sentences the clip is force-aligned to the sentence
+    first; full ASR runs only when the alignment confidence is low.
+    """
+    speech_features = get_stage("speech_features")
+    # Decoded once: the fingerprint keys the cache, the context feeds analyze_audio on a miss
+    audio = await speech_features.run(decode_audio, audio_path)
+    fingerprint = audio.fingerprint
+
+    stimulus = match_stimulus(stimulus_sentence) if alignment_available() else None
+    alignment_variant = f"{ALIGN_BUNDLE}/{stimulus}"
+    transcription_result = None
+    if stimulus:
+        transcription_result = analysis_cache.get("alignment", fingerprint, alignment_variant)
+    else:
+        transcription_result = analysis_cache.get("transcription", fingerprint, TRANSCRIPTION_VARIANT)
+    acoustic_features = analysis_cache.get("acoustic", fingerprint, PITCH_ENGINE)
+    pause_analysis = analysis_cache.get("pauses", fingerprint, str(MIN_SILENCE_DURATION))
+    speech_onset_ms = analysis_cache.get("vad", fingerprint, VAD_VARIANT)
+
+    pending = {}
+    if transcription_result is None:
+        if stimulus:
+            # CTC forced alignment to the stimulus (thread pool), on the already decoded clip
+            pending["alignment"] = get_stage("speech_align").run(align_to_stimulus, audio, stimulus)
+        else:
+            # Whisper (thread pool)
+            pending["transcription"] = get_stage("speech_transcribe").run(transcribe_with_timestamps, audio_path)
+    if acoustic_features is None or pause_analysis is None or speech_onset_ms is None:
+        # Audio decoded once: acoustic features, audio-based pauses, VAD onset (process pool)
+        pending["audio"] = speech_features.run(analyze_audio, audio, min_silence_duration=MIN_SILENCE_DURATION)
+
+    results = dict(zip(pending, await asyncio.gather(*pending.values())))
+
+    if "alignment" in results and results["alignment"] is not None:
+        transcription_result = {**results["alignment"], "mode": "aligned"}
+        analysis_cache.put("alignment", fingerprint, transcription_result, alignment_variant)
+
+    if stimulus and (transcription_result is None or transcription_result["confidence"] < ALIGN_MIN_CONFIDENCE):
+        # Low-confidence (or failed) alignment: fall back to full ASR
+        transcription_result = analysis_cache.get("transcription", fingerprint, TRANSCRIPTION_VARIANT)
+        if transcription_result is None:
+            results["transcription"] = await get_stage("speech_transcribe").run(transcribe_with_timestamps, audio_path)
+
+    if "transcription" in results:
+        transcription_result = results["transcription"]
+        if transcription_result["text"] != ERROR_RESULT["text"]:
+            analysis_cache.put("transcription", fingerprint, transcription_result, TRANSCRIPTION_VARIANT)
+    if "audio" in results:
+        acoustic_features = results["audio"]["acoustic_features"]
+        pause_analysis = results["audio"]["pause_analysis"]
+        if acoustic_features:
+            analysis_cache.put("acoustic", fingerprint, acoustic_features, PITCH_ENGINE)
+        if pause_analysis != PAUSE_ERROR_RESULT:
+            analysis_cache.put("pauses", fingerprint, pause_analysis, str(MIN_SILENCE_DURATION))
+        speech_onset_ms = results["audio"]["speech_onset_ms"]
+        if speech_onset_ms >= 0:
+            analysis_cache.put("vad", fingerprint, speech_onset_ms, VAD_VARIANT)
+
+    return transcription_result, acoustic_features, pause_analysis, speech_onset_ms
+
 @router.post("/start-test", response_model=SpeechTestResponse)
-async def start_test(request: SpeechTestRequest, db: Session = Depends(get_db)):
+async def start_test(request: SpeechTestRequest, db: AsyncSession = Depends(get_async_db)):
     session_id = str(uuid.uuid4())
-    sessions[session_id] = {
+    # Per-sentence detail goes to SentenceRecording rows; the session only keeps running aggregates
+    await get_stage("speech_session").run(speech_sessions.put, session_id, {
         "user_id": request.user_id,
-        "results": [],
+        "aggregates": new_aggregates(),
         "audiometry": {}
-    }
+    })
 
     # Create database record
     db_test = SpeechTestResult(
@@ -58,7 +174,7 @@ async def start_test(request: SpeechTestRequest, db: Session = Depends(get_db)):
         user_consented=True  # Assuming consent for now
     )
     db.add(db_test)
-    db.commit()
+    await db.commit()
 
     return SpeechTestResponse(
         session_id=session_id,
@@ -72,8 +188,9 @@ async def analyze_speech(
     stimulus_sentence: str = Form(...),
     audio_end_timestamp: float = Form(...), # Client-side timestamp when recording stopped
     speech_start_timestamp: float = Form(...), # Client-side timestamp when user started speaking (optional fallback)
+    recording_offset_ms: float = Form(0.0), # Gap between stimulus end and recording start
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Save temp file
     with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
@@ -81,34 +198,25 @@ async def analyze_speech(
         tmp_path = tmp.name
 
     try:
-        # 2. Transcribe (Whisper)
-        transcription_result = transcribe_with_timestamps(tmp_path)
+        # 2. Transcribe while the audio is analyzed (cached by PCM content)
+        # 6. Pauses - Use AUDIO-BASED detection (more accurate than Whisper timestamps)
+        transcription_result, acoustic_features, pause_analysis, speech_onset_ms = await transcribe_and_analyze(
+            tmp_path, stimulus_sentence
+        )
         transcription_text = transcription_result["text"]
-        word_timestamps = transcription_result["words"]
+        word_timestamps = word_timings(transcription_result["words"])
 
         # 3. Calculate Reaction Time
-        # Option A: Use VAD on server
-        with open(tmp_path, "rb") as f:
-            audio_bytes = f.read()
-
-        # We need raw PCM for VAD, but file is likely WAV/WebM.
-        # For simplicity, let's rely on client-side timestamps or VAD if format allows.
-        # Assuming client sends a rough timestamp, we can refine it or just use it.
-        # Let's use the client provided timestamp for now as VAD on compressed web audio is tricky without conversion.
-        # Ideally: convert to PCM -> VAD.
-
-        # Placeholder for VAD logic if we had PCM
-        # vad_start = detect_speech_start(pcm_bytes, 16000)
-
-        # Reaction time = (Time user started speaking) - (Time audio stimulus ended)
-        # This requires client to send both.
-        # Let's assume the client sends the calculated reaction time or we calculate it here.
-        # Actually, the prompt says "detect_speech_start" is in VAD service.
-        # Let's assume we use the client's speech_start_timestamp for now to be safe,
-        # as converting WebM/WAV to 16k mono PCM for webrtcvad requires ffmpeg/pydub which we have.
-
-        # Simple fallback:
-        reaction_time_ms = speech_start_timestamp # Client calculated or passed raw
+        # Reaction time = (Time user started speaking) - (Time audio stimulus ended).
+        # Server-side WebRTC VAD onset on the decoded clip, measured from the start
+        # of the recording plus the client-reported gap between stimulus end and
+        # recording start. Falls back to the client timestamp when no speech is found.
+        if speech_onset_ms >= 0:
+            reaction_time_ms = recording_offset_ms + speech_onset_ms
+            reaction_time_source = "vad"
+        else:
+            reaction_time_ms = speech_start_timestamp # Client calculated or passed raw
+            reaction_time_source = "client"
 
         # 4. Accuracy (Levenshtein)
         # Normalize strings
@@ -117,34 +225,24 @@ async def analyze_speech(
         accuracy = ratio(ref, hyp) * 100
 
         # 5. Features
-        acoustic_features = extract_acoustic_features(tmp_path)
-        linguistic_features = extract_linguistic_features(transcription_text)
-
-        # 6. Pauses - Use AUDIO-BASED detection (more accurate than Whisper timestamps)
-        from backend.app.services.speech.pause_analyzer import detect_pauses_from_audio
-        pause_analysis = detect_pauses_from_audio(tmp_path, min_silence_duration=0.3)
+        linguistic_features = await get_stage("speech_linguistic").run(extract_linguistic_features, transcription_text)
 
         # 7. ML-Based Scoring (with improved pause analysis)
-        scores = calculate_ml_risk_score(
+        # One predict_proba pass on the speech_score thread stage
+        scores = await get_stage("speech_score").run(
+            calculate_ml_risk_score,
             reaction_time_ms=reaction_time_ms,
             speech_rate_wpm=acoustic_features.get("speech_rate_wpm", 120),
             pause_analysis=pause_analysis,  # Now using audio-based pauses!
             word_accuracy=accuracy
         )
 
-        # Store result in memory
-        if session_id in sessions:
-            sessions[session_id]["results"].append({
-                "sentence": stimulus_sentence,
-                "transcription": transcription_text,
-                "accuracy": accuracy,
-                "scores": scores,
-                "acoustic_features": acoustic_features,
-                "linguistic_features": linguistic_features
-            })
+        # Store calls can wait on the SQLite lock (BEGIN IMMEDIATE): keep them off the event loop
+        session_stage = get_stage("speech_session")
+        session = await session_stage.run(speech_sessions.get, session_id)
 
         # Save to database
-        sentence_index = len(sessions.get(session_id, {}).get("results", [])) - 1
+        sentence_index = session["aggregates"]["count"] if session else 0
         db_recording = SentenceRecording(
             session_id=session_id,
             sentence_index=sentence_index,
@@ -162,7 +260,22 @@ async def analyze_speech(
             risk_level=scores["risk_level"]
         )
         db.add(db_recording)
-        db.commit()
+        await db.commit()
+
+        # Fold the sentence into the session's running aggregates (atomic, visible to every worker).
+        # Only after the commit, so a failed or retried save is not counted twice
+        sentence_metrics = {
+            "overall_risk": scores["overall_risk"],
+            "reaction_time_score": scores["component_scores"]["reaction_time_score"],
+            "accuracy_score": scores["component_scores"]["accuracy_score"],
+            "word_accuracy": accuracy,
+            "reaction_time_ms": reaction_time_ms,
+            "speech_rate_wpm": acoustic_features.get("speech_rate_wpm", 0),
+            "avg_pause_duration": pause_analysis["avg_pause_duration"],
+        }
+        await session_stage.run(
+            speech_sessions.update, session_id, lambda s: add_sentence(s["aggregates"], sentence_metrics)
+        )
         print(f"✅ Saved sentence {sentence_index + 1} to database")
 
         return SpeechAnalysisResponse(
@@ -174,7 +287,8 @@ async def analyze_speech(
             long_pause_count=pause_analysis["long_pause_count"],
             pause_locations=[
                 PauseLocation(
-                    after_word=f"pause_{i+1}",  # Audio-based doesn't have word context
+                    # Audio-based pauses placed after the preceding word from the word timings
+                    after_word=pause_label(p, word_timestamps, i),
                     duration=p["duration"]
                 ) for i, p in enumerate(pause_analysis.get("pause_locations", []))
             ],
@@ -183,7 +297,11 @@ async def analyze_speech(
             features=SpeechFeatures(
                 acoustic_features=acoustic_features,
                 linguistic_features=linguistic_features
-            )
+            ),
+            reaction_time_source=reaction_time_source,
+            transcription_mode=transcription_result.get("mode", "asr"),
+            alignment_score=transcription_result.get("match_score"),
+            word_timings=[WordTiming(**t) for t in word_timestamps]
         )
 
     finally:
@@ -193,7 +311,8 @@ async def analyze_speech(
 async def audiometry_test(request: AudiometryRequest):
     # Use a simple session ID - in production this should come from the request
     session_id = f"audio_{request.frequency_hz}"
-    result = adaptive_threshold_test(
+    result = await get_stage("speech_session").run(
+        adaptive_threshold_test,
         request.frequency_hz,
         request.volume_level,
         request.user_heard,
@@ -202,17 +321,19 @@ async def audiometry_test(request: AudiometryRequest):
     return AudiometryResponse(**result)
 
 @router.get("/results/{session_id}", response_model=SpeechResultsResponse)
-async def get_results(session_id: str, db: Session = Depends(get_db)):
+async def get_results(session_id: str, db: AsyncSession = Depends(get_async_db)):
     print(f"🔍 Looking for session: {session_id}")
-    print(f"📋 Available sessions: {list(sessions.keys())}")
+    session_store = get_stage("speech_session")
+    print(f"📋 Active sessions: {(await session_store.run(speech_sessions.stats))['sessions']}")
 
-    session = sessions.get(session_id)
+    session = await session_store.run(speech_sessions.get, session_id)
     if not session:
-        print(f"❌ Session {session_id} not found in memory")
+        print(f"❌ Session {session_id} not found in the session store")
         raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
 
-    results = session["results"]
-    if not results:
+    # Running aggregates kept by analyze_speech: finalizing is O(1) in the number of sentences
+    aggregates = session["aggregates"]
+    if aggregates["count"] == 0:
         return SpeechResultsResponse(
             overall_risk_score=0,
             reaction_time_score=0,
@@ -221,14 +342,11 @@ async def get_results(session_id: str, db: Session = Depends(get_db)):
             recommendations=["Complete the test to see results"]
         )
 
-    # Average scores
-    avg_risk = sum(r["scores"]["overall_risk"] for r in results) / len(results)
-    avg_rt_score = sum(r["scores"]["component_scores"]["reaction_time_score"] for r in results) / len(results)
-    avg_acc_score = sum(r["scores"]["component_scores"]["accuracy_score"] for r in results) / len(results)
-
-    # Calculate aggregated metrics
-    avg_reaction_time = sum(r.get("scores", {}).get("reaction_time_ms", 0) for r in results) / len(results) if results else 0
-    avg_accuracy = sum(r.get("accuracy", 0) for r in results) / len(results) if results else 0
+    summary = summarize(aggregates)
+    avg_risk = summary["overall_risk"]["mean"]
+    avg_rt_score = summary["reaction_time_score"]["mean"]
+    avg_acc_score = summary["accuracy_score"]["mean"]
+    avg_accuracy = summary["word_accuracy"]["mean"]
 
     recommendations = []
     if avg_risk > 60:
@@ -247,7 +365,7 @@ async def get_results(session_id: str, db: Session = Depends(get_db)):
         risk_level = "High"
 
     # Update database with final aggregated results
-    db_test = db.query(SpeechTestResult).filter(SpeechTestResult.session_id == session_id).first()
+    db_test = await db.scalar(select(SpeechTestResult).where(SpeechTestResult.session_id == session_id))
     if db_test:
         db_test.completed = True
         db_test.overall_risk_score = avg_risk
@@ -255,8 +373,12 @@ async def get_results(session_id: str, db: Session = Depends(get_db)):
         db_test.reaction_time_score = avg_rt_score
         db_test.accuracy_score = avg_acc_score
         db_test.avg_word_accuracy = avg_accuracy
-        db_test.sentence_results = results  # Store all results as JSON
-        db.commit()
+        db_test.avg_reaction_time_ms = summary["reaction_time_ms"]["mean"]
+        db_test.avg_speech_rate_wpm = summary["speech_rate_wpm"]["mean"]
+        db_test.avg_pause_duration = summary["avg_pause_duration"]["mean"]
+        if db_test.user_id:
+            await refresh_assessment(db, db_test.user_id)
+        await db.commit()
         print(f"✅ Saved final results for session {session_id}")
 
     return SpeechResultsResponse(
@@ -264,20 +386,37 @@ async def get_results(session_id: str, db: Session = Depends(get_db)):
         reaction_time_score=avg_rt_score,
         speech_quality_score=avg_acc_score,
         hearing_score=0, # Placeholder
-        recommendations=recommendations
+        recommendations=recommendations,
+        sentence_count=aggregates["count"],
+        risk_score_std=summary["overall_risk"]["std"]
     )
 
 # Data Export Endpoints for ML Training
 from backend.app.services.data_export import get_statistics, export_to_csv, export_detailed_json
 
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit rates of the content-addressed analysis cache and the linguistic feature cache"""
+    return {**analysis_cache.stats(), "linguistic": linguistic_service.stats()}
+
+@router.get("/sessions/stats")
+async def session_stats():
+    """Active in-progress sessions per store (backend, expiry and eviction counters)"""
+    session_store = get_stage("speech_session")
+    return {
+        "speech": await session_store.run(speech_sessions.stats),
+        "audiometry": await session_store.run(audiometry_sessions.stats),
+    }
+
+# Sync handlers: FastAPI runs them in its threadpool, off the event loop
 @router.get("/data/statistics")
-async def data_statistics(db: Session = Depends(get_db)):
+def data_statistics(db: Session = Depends(get_db)):
     """Get statistics about collected speech test data"""
     stats = get_statistics(db)
     return stats
 
 @router.get("/data/export/csv")
-async def export_data_csv(
+def export_data_csv(
     include_unlabeled: bool = True,
     db: Session = Depends(get_db)
 ):
@@ -291,7 +430,7 @@ async def export_data_csv(
     }
 
 @router.get("/data/export/json")
-async def export_data_json(
+def export_data_json(
     include_unlabeled: bool = True,
     db: Session = Depends(get_db)
 ):
@@ -2,13 +2,15 @@
 Unified multi-modal analysis router
 Combines EEG, Speech, and Cognitive Games results
 """
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import cast, desc, literal, null, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from typing import List
+from typing import List, NamedTuple, Optional
 
-from backend.app.database import get_db
+from backend.app.database import get_async_db
 from backend.app.models.unified_schemas import (
     TestCompletionStatus,
     UnifiedAnalysisResponse,
@@ -19,9 +21,12 @@ from backend.app.models.unified_schemas import (
 from backend.app.models.db_models import (
     SpeechTestResult,
     CognitiveGameSession,
-    EEGTestResult
+    EEGTestResult,
+    UnifiedAssessment
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/api/unified",
     tags=["unified-analysis"]
@@ -34,22 +39,104 @@ WEIGHTS = {
     "games": 0.25     # 25% - Behavioral indicators
 }
 
-@router.get("/status/{user_id}", response_model=TestCompletionStatus)
-async def get_completion_status(user_id: str, db: Session = Depends(get_db)):
+# Bump when the scoring below changes: stored assessments from older logic are recomputed on read
+ASSESSMENT_LOGIC_VERSION = 1
+
+class SpeechRow(NamedTuple):
+    """Latest completed speech test: the columns the unified analysis reads"""
+    id: int
+    created_at: Optional[datetime]
+    overall_risk_score: Optional[float]
+    pause_score: Optional[float]
+    reaction_time_score: Optional[float]
+    avg_pause_duration: Optional[float]
+
+
+class GameRow(NamedTuple):
+    """A completed cognitive game session: the columns the unified analysis reads"""
+    id: int
+    created_at: Optional[datetime]
+    game_type: str
+    score: Optional[float]
+    attention_score: Optional[float]
+    executive_function_score: Optional[float]
+    processing_speed_score: Optional[float]
+
+
+class EEGRow(NamedTuple):
+    """Latest completed EEG test: the columns the unified analysis reads"""
+    id: int
+    created_at: Optional[datetime]
+    risk_score: Optional[float]
+
+
+class UserTests(NamedTuple):
+    """A user's completed results that feed the unified status and analysis"""
+    speech_test: Optional[SpeechRow]      # latest
+    games_sessions: List[GameRow]         # all, oldest first
+    eeg_test: Optional[EEGRow]            # latest
+
+
+# source -> (row type, table); each row field is the table column of the same name
+_SOURCES = {
+    "speech": (SpeechRow, SpeechTestResult),
+    "games": (GameRow, CognitiveGameSession),
+    "eeg": (EEGRow, EEGTestResult),
+}
+
+# Columns of the combined query (every row field except id/created_at); each source fills its own
+_UNION_COLUMNS = {
+    name: getattr(model, name).type
+    for row_type, model in _SOURCES.values()
+    for name in row_type._fields if name not in ("id", "created_at")
+}
+
+
+def _test_rows(source: str, user_id: str):
+    """SELECT of one source's completed rows for a user in the combined column layout"""
+    row_type, model = _SOURCES[source]
+    selected = [literal(source).label("source"), model.id.label("id"), model.created_at.label("created_at")]
+    for name, type_ in _UNION_COLUMNS.items():
+        column = getattr(model, name) if name in row_type._fields else cast(null(), type_)
+        selected.append(column.label(name))
+    return select(*selected).where(model.user_id == user_id, model.completed == True)
+
+
+def user_tests_query(user_id: str):
     """
-    Check which tests the user has completed
+    One statement for the latest speech test, all completed games and the latest
+    EEG test of a user (UNION ALL over the (user_id, completed, created_at) indexes).
     """
-    # Check Speech Test
-    speech_test = db.query(SpeechTestResult).filter(
-        SpeechTestResult.user_id == user_id,
-        SpeechTestResult.completed == True
-    ).order_by(desc(SpeechTestResult.created_at)).first()
-
-    # Check Cognitive Games (all 4 games)
-    games_sessions = db.query(CognitiveGameSession).filter(
-        CognitiveGameSession.user_id == user_id,
-        CognitiveGameSession.completed == True
-    ).all()
+    # created_at has one-second resolution: the id breaks ties between results saved together
+    speech = _test_rows("speech", user_id).order_by(
+        desc(SpeechTestResult.created_at), desc(SpeechTestResult.id)
+    ).limit(1)
+    games = _test_rows("games", user_id)
+    eeg = _test_rows("eeg", user_id).order_by(desc(EEGTestResult.created_at), desc(EEGTestResult.id)).limit(1)
+
+    # ORDER BY / LIMIT members must be wrapped in subqueries inside a UNION
+    return union_all(select(speech.subquery()), games, select(eeg.subquery()))
+
+
+async def fetch_user_tests(db: AsyncSession, user_id: str) -> UserTests:
+    """Load a user's completed results in one round trip"""
+    rows = (await db.execute(user_tests_query(user_id))).all()
+
+    tests = {"speech": None, "games": [], "eeg": None}
+    for row in sorted(rows, key=lambda r: (r.created_at or datetime.min, r.id)):
+        row_type, _ = _SOURCES[row.source]
+        values = row_type(*(getattr(row, name) for name in row_type._fields))
+        if row.source == "games":
+            tests["games"].append(values)
+        else:
+            tests[row.source] = values
+
+    return UserTests(tests["speech"], tests["games"], tests["eeg"])
+
+
+def completion_status(tests: UserTests) -> TestCompletionStatus:
+    """Which tests are complete, with their scores"""
+    speech_test, games_sessions, eeg_test = tests
 
     speech_completed = speech_test is not None
     speech_score = speech_test.overall_risk_score if speech_test else None
@@ -63,12 +150,6 @@ async def get_completion_status(user_id: str, db: Session = Depends(get_db)):
         # Calculate average score from all games
         games_score = sum(s.score for s in games_sessions) / len(games_sessions)
 
-    # Check EEG Test
-    eeg_test = db.query(EEGTestResult).filter(
-        EEGTestResult.user_id == user_id,
-        EEGTestResult.completed == True
-    ).order_by(desc(EEGTestResult.created_at)).first()
-
     eeg_completed = eeg_test is not None
     eeg_score = eeg_test.risk_score if eeg_test else None
 
@@ -87,33 +168,13 @@ async def get_completion_status(user_id: str, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/results/{user_id}", response_model=UnifiedAnalysisResponse)
-async def get_unified_results(user_id: str, db: Session = Depends(get_db)):
+def build_unified_analysis(user_id: str, tests: UserTests, status: TestCompletionStatus) -> UnifiedAnalysisResponse:
     """
-    Get comprehensive unified analysis results
-    Combines all three modalities with weighted scoring
+    Combine all three modalities with weighted scoring
+    (requires status.all_complete)
     """
-    # 1. Fetch all test results
-    status = await get_completion_status(user_id, db)
-
-    if not status.all_complete:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Not all tests complete. Completed: {status.total_completed}/3"
-        )
-
-    # Get detailed results
-    speech_test = db.query(SpeechTestResult).filter(
-        SpeechTestResult.user_id == user_id,
-        SpeechTestResult.completed == True
-    ).order_by(desc(SpeechTestResult.created_at)).first()
-
-    games_sessions = db.query(CognitiveGameSession).filter(
-        CognitiveGameSession.user_id == user_id,
-        CognitiveGameSession.completed == True
-    ).all()
-
-    # 2. Calculate weighted final score
+    # 1. Calculate weighted final score
+    speech_test, games_sessions = tests.speech_test, tests.games_sessions
     eeg_score = status.eeg_score or 0  # Placeholder
     speech_score = status.speech_score or 0
     games_score = status.games_score or 0
@@ -124,7 +185,7 @@ async def get_unified_results(user_id: str, db: Session = Depends(get_db)):
         games_score * WEIGHTS["games"]
     )
 
-    # 3. Determine risk level
+    # 2. Determine risk level
     if overall_risk_score < 40:
         risk_level = "Low"
     elif overall_risk_score < 70:
@@ -132,22 +193,22 @@ async def get_unified_results(user_id: str, db: Session = Depends(get_db)):
     else:
         risk_level = "High"
 
-    # 4. Calculate cognitive domain scores
+    # 3. Calculate cognitive domain scores
     cognitive_domains = calculate_cognitive_domains(
         eeg_score, speech_test, games_sessions
     )
 
-    # 5. Generate key findings
+    # 4. Generate key findings
     key_findings = generate_key_findings(
         eeg_score, speech_test, games_sessions, cognitive_domains
     )
 
-    # 6. Generate recommendations
+    # 5. Generate recommendations
     recommendations = generate_recommendations(
         overall_risk_score, cognitive_domains
     )
 
-    # 7. Calculate confidence
+    # 6. Calculate confidence
     # Higher confidence if all tests agree, lower if they disagree
     score_variance = calculate_variance([eeg_score, speech_score, games_score])
     confidence = max(60, 100 - score_variance)  # 60-100 range
@@ -170,10 +231,132 @@ async def get_unified_results(user_id: str, db: Session = Depends(get_db)):
     )
 
 
+def _insert(db: AsyncSession):
+    """Dialect insert() with ON CONFLICT support (SQLite, PostgreSQL)"""
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise ValueError(f"Unified assessment upsert is not supported on '{dialect}'")
+    return insert(UnifiedAssessment)
+
+
+async def mark_assessment_stale(db: AsyncSession, user_id: str) -> int:
+    """
+    Bump the user's assessment version (INSERT ... ON CONFLICT DO UPDATE) and
+    return it. The upsert locks the row until commit, so concurrent refreshes
+    for one user run one after another, each seeing the results committed before it.
+    """
+    insert = _insert(db)
+    stmt = insert.values(user_id=user_id, version=1, computed_version=0).on_conflict_do_update(
+        index_elements=[UnifiedAssessment.user_id],
+        set_={"version": UnifiedAssessment.version + 1},
+    ).returning(UnifiedAssessment.version)
+    return await db.scalar(stmt)
+
+
+def is_current(assessment: UnifiedAssessment) -> bool:
+    """Computed for the latest results and by the current scoring logic"""
+    return (assessment.computed_version == assessment.version
+            and assessment.logic_version == ASSESSMENT_LOGIC_VERSION)
+
+
+async def refresh_assessment(db: AsyncSession, user_id: str) -> bool:
+    """
+    Recompute and store the user's unified assessment (write-through).
+
+    Call after adding or completing a test result, before the commit: the
+    assessment is written in the same transaction as the result that changed it.
+    A failure (in the upsert or while computing) is logged and rolled back to a
+    savepoint instead of rolling back the result being saved; returns False then.
+    If only the compute failed, the row is left stale and recomputed on the next read.
+    """
+    await db.flush()  # sessions do not autoflush; the pending result must be visible
+
+    try:
+        # Savepoints: a failed upsert or compute rolls back only the assessment
+        async with db.begin_nested():
+            version = await mark_assessment_stale(db, user_id)
+        async with db.begin_nested():
+            tests = await fetch_user_tests(db, user_id)
+            status = completion_status(tests)
+            result = None
+            if status.all_complete:
+                result = build_unified_analysis(user_id, tests, status).model_dump(
+                    mode="json", exclude={"assessment_version"}
+                )
+            # Compare-and-set: only the refresh holding the latest version stores its result
+            await db.execute(
+                update(UnifiedAssessment)
+                .where(UnifiedAssessment.user_id == user_id, UnifiedAssessment.version == version)
+                .values(
+                    computed_version=version,
+                    logic_version=ASSESSMENT_LOGIC_VERSION,
+                    status=status.model_dump(mode="json"),
+                    result=result,
+                )
+            )
+    except Exception:
+        logger.exception("Unified assessment refresh failed for %s", user_id)
+        return False
+    return True
+
+
+async def load_assessment(db: AsyncSession, user_id: str) -> Optional[UnifiedAssessment]:
+    """
+    The stored assessment (a primary-key read). Rows missing, stale or computed
+    by an older ASSESSMENT_LOGIC_VERSION are refreshed here; users without any
+    test get None.
+    """
+    assessment = await db.get(UnifiedAssessment, user_id)
+    if assessment is not None and is_current(assessment):
+        return assessment
+
+    if assessment is None:
+        status = completion_status(await fetch_user_tests(db, user_id))
+        if status.total_completed == 0:
+            return None
+    refreshed = await refresh_assessment(db, user_id)
+    await db.commit()
+    if not refreshed:
+        raise HTTPException(status_code=500, detail="Could not compute the unified assessment")
+    return await db.get(UnifiedAssessment, user_id, populate_existing=True)
+
+
+@router.get("/status/{user_id}", response_model=TestCompletionStatus)
+async def get_completion_status(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Check which tests the user has completed
+    """
+    assessment = await load_assessment(db, user_id)
+    if assessment is None:
+        return completion_status(UserTests(None, [], None))
+    return TestCompletionStatus(**assessment.status)
+
+
+@router.get("/results/{user_id}", response_model=UnifiedAnalysisResponse)
+async def get_unified_results(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get comprehensive unified analysis results
+    Served from the stored assessment, refreshed whenever a test completes
+    """
+    assessment = await load_assessment(db, user_id)
+    if assessment is None or assessment.result is None:
+        total_completed = assessment.status["total_completed"] if assessment else 0
+        raise HTTPException(
+            status_code=400,
+            detail=f"Not all tests complete. Completed: {total_completed}/3"
+        )
+
+    return UnifiedAnalysisResponse(**assessment.result, assessment_version=assessment.version)
+
+
 def calculate_cognitive_domains(
     eeg_score: float,
-    speech_test: SpeechTestResult,
-    games_sessions: List[CognitiveGameSession]
+    speech_test: Optional[SpeechRow],
+    games_sessions: List[GameRow]
 ) -> CognitiveDomainScores:
     """Map test results to cognitive domains"""
 
@@ -229,8 +412,8 @@ def calculate_cognitive_domains(
 
 def generate_key_findings(
     eeg_score: float,
-    speech_test: SpeechTestResult,
-    games_sessions: List[CognitiveGameSession],
+    speech_test: Optional[SpeechRow],
+    games_sessions: List[GameRow],
     domains: CognitiveDomainScores
 ) -> List[KeyFinding]:
     """Generate key findings from analysis"""
@@ -11,6 +11,21 @@ class PredictionResponse(BaseModel):
     risk_level: str
     model_version: str
 
+class WindowPrediction(BaseModel):
+    start_sec: float
+    end_sec: float
+    status_class: int
+    probability: float
+    risk_level: str
+
+class WindowedPredictionResponse(BaseModel):
+    n_windows: int
+    window_size_sec: int
+    step_size_sec: int
+    windows: List[WindowPrediction]
+    aggregate: PredictionResponse
+    max_probability: float
+    high_risk_fraction: float
 
 class SaveEEGResultRequest(BaseModel):
     user_id: str
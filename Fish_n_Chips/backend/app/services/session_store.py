@@ -0,0 +1,277 @@
+"""
+Bounded session state shared by the speech test and audiometry flows.
+
+In-progress test state used to live in module-level dicts, which grew without
+bound and were invisible to other uvicorn workers (a /results request served by
+another worker returned 404). Stores here expire idle sessions and support
+atomic read-modify-write, including appending one sentence result.
+
+Backends (SESSION_STORE):
+    memory      per-process dict with sliding TTL and LRU cap (single worker)
+    sqlite      SQLite file in WAL mode, shared by every worker on the host
+
+Configuration (environment):
+    SESSION_STORE               memory | sqlite (default memory)
+    SESSION_DB                  SQLite path for the sqlite backend (default sessions.db)
+    SESSION_TTL_SECONDS         idle time before a session expires (default 7200)
+    SESSION_MAX_ENTRIES         sessions kept per namespace by the memory backend (default 10000)
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_DB = os.getenv("SESSION_DB", "sessions.db")
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", 7200))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 10000))
+
+def _json_default(value):
+    # Analysis results carry numpy scalars/arrays
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class SessionStore(ABC):
+    """
+    Interface for session state backends.
+
+    State is a JSON-serializable dict per session id. get() returns a copy;
+    changes go through put(), update() or append(), which are atomic per
+    session. Sessions expire after `ttl` seconds without access.
+    """
+    name = "base"
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, state: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def update(self, session_id: str, fn: Callable[[Dict[str, Any]], None],
+               default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Apply fn (which mutates the state in place) atomically and return the new state.
+        A missing session starts from `default`, or is left missing (None) without one.
+        """
+        ...
+
+    def append(self, session_id: str, field: str, item: Any) -> Optional[int]:
+        """Append item to state[field]; returns the new length, None if the session is missing."""
+        state = self.update(session_id, lambda s: s[field].append(item))
+        return len(state[field]) if state is not None else None
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+class MemorySessionStore(SessionStore):
+    """Per-process store: sliding TTL plus an LRU cap on the number of sessions."""
+    name = "memory"
+
+    def __init__(self, namespace: str, ttl: float = SESSION_TTL_SECONDS, max_entries: int = SESSION_MAX_ENTRIES):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (expires_at, state)
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    def _live(self, session_id: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[session_id]
+            self.expired += 1
+            return None
+        return entry[1]
+
+    def _store(self, session_id: str, state: Dict[str, Any], now: float):
+        self._entries[session_id] = (now + self.ttl, state)
+        self._entries.move_to_end(session_id)
+        # Oldest-accessed first: drop expired entries, then enforce the cap
+        while self._entries:
+            oldest_id, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at <= now:
+                self.expired += 1
+            elif len(self._entries) > self.max_entries:
+                self.evicted += 1
+            else:
+                break
+            del self._entries[oldest_id]
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            state = self._live(session_id, now)
+            if state is None:
+                return None
+            self._store(session_id, state, now)
+            return copy.deepcopy(state)
+
+    def put(self, session_id: str, state: Dict[str, Any]):
+        with self._lock:
+            self._store(session_id, copy.deepcopy(state), time.time())
+
+    def update(self, session_id, fn, default=None):
+        now = time.time()
+        with self._lock:
+            state = self._live(session_id, now)
+            if state is None:
+                if default is None:
+                    return None
+                state = copy.deepcopy(default)
+            fn(state)
+            self._store(session_id, state, now)
+            return copy.deepcopy(state)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "namespace": self.namespace,
+                "sessions": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions as JSON rows in a SQLite file (WAL), shared across worker processes.
+
+    update()/append() run inside BEGIN IMMEDIATE, so concurrent writers on
+    other workers are serialized by SQLite and no appended result is lost.
+    """
+    name = "sqlite"
+
+    def __init__(self, namespace: str, path: str = SESSION_DB, ttl: float = SESSION_TTL_SECONDS):
+        self.namespace = namespace
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Autocommit mode; transactions are opened explicitly
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_state ("
+            "namespace TEXT NOT NULL, session_id TEXT NOT NULL, state TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, PRIMARY KEY (namespace, session_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_session_state_expires ON session_state (expires_at)")
+        self._writes = 0
+
+    @staticmethod
+    def _dumps(state: Dict[str, Any]) -> str:
+        return json.dumps(state, default=_json_default)
+
+    def _read(self, session_id: str, now: float) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT state FROM session_state WHERE namespace = ? AND session_id = ? AND expires_at > ?",
+            (self.namespace, session_id, now)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, session_id: str, state: Dict[str, Any], now: float):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO session_state (namespace, session_id, state, expires_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, session_id, self._dumps(state), now + self.ttl)
+        )
+        self._writes += 1
+        # Purge expired sessions occasionally rather than on every write
+        if self._writes % 256 == 0:
+            self._conn.execute("DELETE FROM session_state WHERE expires_at <= ?", (now,))
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            state = self._read(session_id, now)
+            if state is not None:
+                # Sliding expiry
+                self._conn.execute(
+                    "UPDATE session_state SET expires_at = ? WHERE namespace = ? AND session_id = ?",
+                    (now + self.ttl, self.namespace, session_id)
+                )
+            return state
+
+    def put(self, session_id: str, state: Dict[str, Any]):
+        with self._lock:
+            self._write(session_id, state, time.time())
+
+    def update(self, session_id, fn, default=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._read(session_id, now)
+                if state is None:
+                    if default is None:
+                        self._conn.execute("ROLLBACK")
+                        return None
+                    state = copy.deepcopy(default)
+                fn(state)
+                self._write(session_id, state, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return state
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM session_state WHERE namespace = ? AND session_id = ?", (self.namespace, session_id)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = self._conn.execute(
+                "SELECT COUNT(*) FROM session_state WHERE namespace = ? AND expires_at > ?",
+                (self.namespace, time.time())
+            ).fetchone()[0]
+        return {
+            "backend": self.name,
+            "namespace": self.namespace,
+            "sessions": sessions,
+            "ttl_seconds": self.ttl,
+            "path": self.path,
+        }
+
+SESSION_BACKENDS = {
+    MemorySessionStore.name: MemorySessionStore,
+    SQLiteSessionStore.name: SQLiteSessionStore,
+}
+
+def create_session_store(namespace: str, backend: str = SESSION_STORE) -> SessionStore:
+    if backend not in SESSION_BACKENDS:
+        raise ValueError(f"Unknown session store '{backend}', expected one of {list(SESSION_BACKENDS)}")
+    return SESSION_BACKENDS[backend](namespace)
+
+# In-progress speech tests ({"user_id", "aggregates", "audiometry"}, aggregates from
+# session_aggregates.new_aggregates) and audiometry staircases
+speech_sessions = create_session_store("speech")
+audiometry_sessions = create_session_store("audiometry")
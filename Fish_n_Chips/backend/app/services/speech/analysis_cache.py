@@ -0,0 +1,169 @@
+"""
+Content-addressed cache for per-clip speech analysis results.
+
+Entries are keyed by a hash of the decoded PCM (AudioContext.fingerprint), so
+a retried upload or a replayed reference recording skips Whisper and the
+librosa analyzers even if the container bytes differ. Values live in a
+size-bounded in-memory LRU, optionally backed by a SQLite file shared by all
+workers and surviving restarts.
+
+Configuration (environment):
+    SPEECH_CACHE_MAX_BYTES          in-memory budget (pickled size, default 64 MB; 0 disables)
+    SPEECH_CACHE_DB                 SQLite path for the on-disk tier (unset = memory only)
+    SPEECH_CACHE_DISK_MAX_ENTRIES   rows kept on disk before the least recently used are dropped
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+SPEECH_CACHE_MAX_BYTES = int(os.getenv("SPEECH_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+SPEECH_CACHE_DB = os.getenv("SPEECH_CACHE_DB", "")
+SPEECH_CACHE_DISK_MAX_ENTRIES = int(os.getenv("SPEECH_CACHE_DISK_MAX_ENTRIES", 100000))
+
+# Cached result kinds
+KINDS = ("transcription", "alignment", "acoustic", "pauses", "vad")
+
+class DiskTier:
+    """SQLite key/value table; WAL so several workers can read while one writes."""
+
+    def __init__(self, path: str, max_entries: int = SPEECH_CACHE_DISK_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_cache_accessed ON analysis_cache (accessed_at)")
+        self._conn.commit()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE analysis_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, value: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, accessed_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            self._writes += 1
+            # Trim occasionally rather than on every write
+            if self._writes % 256 == 0:
+                self._conn.execute(
+                    "DELETE FROM analysis_cache WHERE key IN ("
+                    "SELECT key FROM analysis_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis_cache")
+            self._conn.commit()
+
+class AnalysisCache:
+    """
+    Two-tier (memory LRU, optional SQLite) cache of pickled analysis results.
+
+    Keys are "<kind>:<variant>:<fingerprint>", where the variant captures the
+    settings that change the result (backend/model, pitch engine, thresholds).
+    """
+
+    def __init__(self, max_bytes: int = SPEECH_CACHE_MAX_BYTES, db_path: str = SPEECH_CACHE_DB):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.disk = DiskTier(db_path) if db_path else None
+        self._counters = {kind: {"memory_hits": 0, "disk_hits": 0, "misses": 0} for kind in KINDS}
+
+    @staticmethod
+    def key(kind: str, fingerprint: str, variant: str = "") -> str:
+        return f"{kind}:{variant}:{fingerprint}"
+
+    def _remember(self, key: str, blob: bytes):
+        if len(blob) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = blob
+        self._bytes += len(blob)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def get(self, kind: str, fingerprint: str, variant: str = "") -> Optional[Any]:
+        key = self.key(kind, fingerprint, variant)
+        counters = self._counters[kind]
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                counters["memory_hits"] += 1
+                return pickle.loads(blob)
+
+        blob = self.disk.get(key) if self.disk else None
+        with self._lock:
+            if blob is None:
+                counters["misses"] += 1
+                return None
+            counters["disk_hits"] += 1
+            self._remember(key, blob)
+        return pickle.loads(blob)
+
+    def put(self, kind: str, fingerprint: str, value: Any, variant: str = ""):
+        key = self.key(kind, fingerprint, variant)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, blob)
+        if self.disk:
+            self.disk.put(key, blob)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = {}
+            for kind, counters in self._counters.items():
+                hits = counters["memory_hits"] + counters["disk_hits"]
+                lookups = hits + counters["misses"]
+                kinds[kind] = {**counters, "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+            stats = {
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_path": self.disk.path if self.disk else None,
+                "kinds": kinds,
+            }
+        if self.disk:
+            stats["disk_entries"] = self.disk.count()
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for counters in self._counters.values():
+                for name in counters:
+                    counters[name] = 0
+        if self.disk:
+            self.disk.clear()
+
+analysis_cache = AnalysisCache()
@@ -0,0 +1,87 @@
+"""
+Shared decoded-audio context for the speech analyzers.
+
+The upload is decoded once into a float32 buffer; intermediates that several
+analyzers need (RMS frame envelopes, STFT magnitudes, 16-bit PCM for VAD) are
+computed lazily and cached on the context so each is computed at most once
+per request.
+"""
+import hashlib
+import librosa
+import numpy as np
+from typing import Dict, Optional, Tuple, Union
+
+from backend.app.resampling import resample_polyphase
+
+class AudioContext:
+    def __init__(self, y: np.ndarray, sr: int, source: Optional[str] = None):
+        self.y = np.ascontiguousarray(y, dtype=np.float32)
+        self.sr = int(sr)
+        self.source = source
+        self._rms: Dict[Tuple[int, int], np.ndarray] = {}
+        self._stft: Dict[Tuple[int, int], np.ndarray] = {}
+        self._fingerprint: Optional[str] = None
+        self._pcm16: Dict[int, np.ndarray] = {}
+        self._resampled: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_file(cls, audio_path: str, sr: Optional[int] = None) -> "AudioContext":
+        """Decode (and optionally resample) an audio file once. sr=None keeps the native rate."""
+        y, sr = librosa.load(audio_path, sr=sr)
+        return cls(y, sr, source=audio_path)
+
+    @classmethod
+    def ensure(cls, audio: Union[str, "AudioContext"]) -> "AudioContext":
+        """Accept either a path (decoded here) or an existing context."""
+        if isinstance(audio, AudioContext):
+            return audio
+        return cls.from_file(audio)
+
+    @property
+    def duration(self) -> float:
+        return len(self.y) / self.sr
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the decoded PCM and its rate (independent of container/metadata)."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(str(self.sr).encode())
+            digest.update(memoryview(self.y).cast("B"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def resampled(self, sr: int) -> np.ndarray:
+        """float32 waveform at `sr` (polyphase-resampled from the decoded buffer; the buffer itself at the native rate)."""
+        if sr == self.sr:
+            return self.y
+        if sr not in self._resampled:
+            self._resampled[sr] = resample_polyphase(self.y[:, np.newaxis], self.sr, sr)[:, 0]
+        return self._resampled[sr]
+
+    def pcm16(self, sr: Optional[int] = None) -> np.ndarray:
+        """Mono 16-bit PCM (little-endian int16) at `sr` (default: native rate), polyphase-resampled if needed."""
+        sr = sr or self.sr
+        if sr not in self._pcm16:
+            self._pcm16[sr] = (np.clip(self.resampled(sr), -1.0, 1.0) * 32767).astype("<i2")
+        return self._pcm16[sr]
+
+    def rms(self, frame_length: int = 2048, hop_length: int = 512) -> np.ndarray:
+        """RMS frame envelope [n_frames] (librosa.feature.rms on the waveform)."""
+        key = (frame_length, hop_length)
+        if key not in self._rms:
+            self._rms[key] = librosa.feature.rms(y=self.y, frame_length=frame_length, hop_length=hop_length)[0]
+        return self._rms[key]
+
+    def stft_magnitude(self, n_fft: int = 2048, hop_length: int = 512) -> np.ndarray:
+        """|STFT| [1 + n_fft // 2, n_frames] with librosa's default window and centering."""
+        key = (n_fft, hop_length)
+        if key not in self._stft:
+            self._stft[key] = np.abs(librosa.stft(self.y, n_fft=n_fft, hop_length=hop_length))
+        return self._stft[key]
+
+    def mfcc(self, n_mfcc: int = 13, n_fft: int = 2048, hop_length: int = 512) -> np.ndarray:
+        """MFCCs from the cached STFT (same result as librosa.feature.mfcc(y=...))."""
+        power = self.stft_magnitude(n_fft, hop_length) ** 2
+        mel = librosa.feature.melspectrogram(S=power, sr=self.sr)
+        return librosa.feature.mfcc(S=librosa.power_to_db(mel), sr=self.sr, n_mfcc=n_mfcc)
@@ -0,0 +1,38 @@
+"""
+Single-decode audio analysis for one recorded sentence.
+
+Decodes the upload once into an AudioContext and runs every waveform analyzer
+on it, so the file is not re-read per analyzer. decode_audio and analyze_audio
+run on the speech_features process stage; the router looks up the cache by the
+decoded context's fingerprint and hands the same context to analyze_audio on a
+miss, so the clip is decoded only once.
+"""
+from typing import Any, Dict, Union
+
+from backend.app.services.speech.audio_context import AudioContext
+from backend.app.services.speech.feature_extractor import extract_acoustic_features
+from backend.app.services.speech.pause_analyzer import detect_pauses_from_audio
+from backend.app.services.speech.vad_service import detect_speech_onset
+
+def decode_audio(audio_path: str) -> AudioContext:
+    """Decode a clip and compute its content fingerprint (carried with the context)."""
+    ctx = AudioContext.from_file(audio_path)
+    ctx.fingerprint  # hash in the worker; cached on the context, so it travels with it
+    return ctx
+
+def analyze_audio(audio: Union[str, AudioContext], min_silence_duration: float = 0.3) -> Dict[str, Any]:
+    """
+    Args:
+        audio: Audio file path or a context from decode_audio
+
+    Returns:
+        {"acoustic_features": ..., "pause_analysis": ..., "speech_onset_ms": ...}
+        (speech_onset_ms is -1 when the VAD found no speech)
+    """
+    ctx = AudioContext.ensure(audio)
+
+    return {
+        "acoustic_features": extract_acoustic_features(ctx),
+        "pause_analysis": detect_pauses_from_audio(ctx, min_silence_duration=min_silence_duration),
+        "speech_onset_ms": detect_speech_onset(ctx)
+    }
@@ -1,18 +1,20 @@
-# Global state to track test progress (in production, use session storage)
-_test_state = {}
+from backend.app.services.session_store import audiometry_sessions
+
+def _record_step(current_volume: float):
+    def apply(state: dict):
+        state["step_count"] += 1
+        state["volumes"].append(current_volume)
+    return apply
 
 def adaptive_threshold_test(frequency: int, current_volume: float, user_heard: bool, session_id: str = "default") -> dict:
     """
     Implements a simple staircase procedure for audiometry.
     For demo purposes, we'll complete after 2 steps.
     """
-    # Initialize or get state
-    if session_id not in _test_state:
-        _test_state[session_id] = {"step_count": 0, "volumes": []}
-
-    state = _test_state[session_id]
-    state["step_count"] += 1
-    state["volumes"].append(current_volume)
+    # Initialize or get state (shared, expiring session store)
+    state = audiometry_sessions.update(
+        session_id, _record_step(current_volume), default={"step_count": 0, "volumes": []}
+    )
 
     print(f"Audiometry - Session: {session_id}, Step: {state['step_count']}, Volume: {current_volume}, Heard: {user_heard}")
 
@@ -21,7 +23,7 @@ def adaptive_threshold_test(frequency: int, current_volume: float, user_heard: b
         threshold_db = int(current_volume * 100)
         print(f"Audiometry complete! Threshold: {threshold_db} dB")
         # Clean up state
-        del _test_state[session_id]
+        audiometry_sessions.delete(session_id)
         return {
             "continue_test": False,
             "next_volume": None,
@@ -1,41 +1,124 @@
+import os
 import librosa
 import numpy as np
-import spacy
-from typing import Dict, Any
-
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Downloading spaCy model...")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-
-def extract_acoustic_features(audio_path: str) -> Dict[str, Any]:
+from typing import Dict, Any, Optional, Union
+
+from backend.app.services.speech.audio_context import AudioContext
+# Linguistic features live in the shared lazy spaCy service
+from backend.app.services.speech.linguistic_service import extract_linguistic_features  # noqa: F401
+
+# Pitch engines: "pyin" (probabilistic, accurate; the features the speech model was built on)
+# or "yin" (vectorized, speech F0 range) - opt in per deployment after benchmark_pitch.py
+PITCH_ENGINES = ("yin", "pyin")
+PITCH_ENGINE = os.getenv("PITCH_ENGINE", "pyin")
+
+# Adult speaking F0 range searched by the fast engine
+SPEECH_FMIN = 65.0
+SPEECH_FMAX = 400.0
+YIN_THRESHOLD = 0.15
+
+def yin_pitch(y: np.ndarray, sr: int, fmin: float = SPEECH_FMIN, fmax: float = SPEECH_FMAX,
+              hop_length: Optional[int] = None, threshold: float = YIN_THRESHOLD) -> np.ndarray:
+    """
+    Frame-wise F0 with YIN, vectorized over all frames.
+
+    The difference function comes from one batched FFT cross-correlation and
+    cumulative energy sums; the period is the first cumulative-mean-normalized
+    dip below `threshold` inside [sr/fmax, sr/fmin], refined by parabolic
+    interpolation. Frames without such a dip are unvoiced (NaN).
+
+    Returns:
+        f0 [n_frames] in Hz, NaN where unvoiced
+    """
+    from scipy.fft import irfft, next_fast_len, rfft
+
+    hop_length = hop_length or max(1, sr // 100)
+    min_lag = max(1, int(np.floor(sr / fmax)))
+    max_lag = int(np.ceil(sr / fmin))
+    win = max_lag
+    frame_length = win + max_lag + 1
+
+    y = np.asarray(y, dtype=np.float32)
+    if len(y) < frame_length:
+        return np.full(0, np.nan)
+    frames = np.lib.stride_tricks.sliding_window_view(y, frame_length)[::hop_length].astype(np.float64)
+
+    # r(tau) = sum_{j<win} x[j] x[j + tau] for tau in [0, max_lag]
+    n_fft = next_fast_len(frame_length)
+    spectrum = rfft(frames, n=n_fft, axis=1)
+    head = rfft(frames[:, :win], n=n_fft, axis=1)
+    r = irfft(np.conj(head) * spectrum, n=n_fft, axis=1)[:, :max_lag + 1]
+
+    # d(tau) = E(0) + E(tau) - 2 r(tau), with E(tau) the energy of x[tau:tau + win]
+    energy = np.cumsum(np.concatenate([np.zeros((len(frames), 1)), frames ** 2], axis=1), axis=1)
+    lags = np.arange(max_lag + 1)
+    e_tau = energy[:, lags + win] - energy[:, lags]
+    d = np.maximum(e_tau[:, :1] + e_tau - 2 * r, 0.0)
+
+    # Cumulative mean normalized difference
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cmnd = d[:, 1:] * lags[1:] / np.cumsum(d[:, 1:], axis=1)
+    cmnd = np.concatenate([np.ones((len(frames), 1)), np.nan_to_num(cmnd, nan=1.0)], axis=1)
+
+    # First lag in range that is below threshold and at the bottom of its dip
+    search = cmnd[:, min_lag:max_lag + 1]
+    dip = (search[:, :-1] < threshold) & (search[:, :-1] <= search[:, 1:])
+    voiced = dip.any(axis=1)
+    tau = dip.argmax(axis=1) + min_lag
+
+    # Parabolic interpolation around the chosen lag
+    rows = np.arange(len(frames))
+    left = cmnd[rows, tau - 1]
+    center = cmnd[rows, tau]
+    right = cmnd[rows, tau + 1]
+    denom = left - 2 * center + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / denom, 0.0)
+    period = tau + np.clip(shift, -1.0, 1.0)
+
+    return np.where(voiced, sr / period, np.nan)
+
+def estimate_pitch(y: np.ndarray, sr: int, engine: Optional[str] = None) -> np.ndarray:
+    """
+    F0 track [n_frames] (NaN where unvoiced) using the selected engine.
+    """
+    engine = engine or PITCH_ENGINE
+    if engine == "pyin":
+        f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'), sr=sr)
+        return f0
+    if engine == "yin":
+        return yin_pitch(y, sr)
+    raise ValueError(f"Unknown pitch engine '{engine}', expected one of {PITCH_ENGINES}")
+
+def extract_acoustic_features(audio: Union[str, AudioContext], pitch_engine: Optional[str] = None) -> Dict[str, Any]:
     """
     Extract acoustic features using librosa.
+
+    Args:
+        audio: Audio file path or an already decoded AudioContext
+        pitch_engine: "yin" or "pyin" (defaults to PITCH_ENGINE)
     """
     try:
-        y, sr = librosa.load(audio_path, sr=None)
+        ctx = AudioContext.ensure(audio)
+        y, sr = ctx.y, ctx.sr
 
         # Pitch (F0)
-        f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'))
+        f0 = estimate_pitch(y, sr, pitch_engine)
         f0_clean = f0[~np.isnan(f0)]
 
         pitch_mean = float(np.mean(f0_clean)) if len(f0_clean) > 0 else 0.0
         pitch_std = float(np.std(f0_clean)) if len(f0_clean) > 0 else 0.0
 
         # Energy (RMS)
-        rms = librosa.feature.rms(y=y)
+        rms = ctx.rms()
         energy_mean = float(np.mean(rms))
 
-        # MFCCs
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+        # MFCCs (from the shared STFT)
+        mfccs = ctx.mfcc(n_mfcc=13)
         mfcc_means = np.mean(mfccs, axis=1).tolist()
 
         # Speech Rate (approximate based on duration and non-silent segments)
-        duration = librosa.get_duration(y=y, sr=sr)
+        duration = ctx.duration
 
         return {
             "pitch_mean": pitch_mean,
@@ -47,31 +130,3 @@ def extract_acoustic_features(audio_path: str) -> Dict[str, Any]:
     except Exception as e:
         print(f"Error extracting acoustic features: {e}")
         return {}
-
-def extract_linguistic_features(text: str) -> Dict[str, Any]:
-    """
-    Extract linguistic features using spaCy.
-    """
-    if not text:
-        return {}
-
-    doc = nlp(text)
-
-    word_count = len([token for token in doc if not token.is_punct])
-    unique_words = len(set([token.text.lower() for token in doc if not token.is_punct]))
-
-    total_chars = sum(len(token.text) for token in doc if not token.is_punct)
-    avg_word_length = total_chars / word_count if word_count > 0 else 0
-
-    lexical_diversity = unique_words / word_count if word_count > 0 else 0
-
-    pos_counts = doc.count_by(spacy.attrs.POS)
-    pos_distribution = {doc.vocab[pos].text: count for pos, count in pos_counts.items()}
-
-    return {
-        "word_count": word_count,
-        "unique_words": unique_words,
-        "avg_word_length": avg_word_length,
-        "lexical_diversity": lexical_diversity,
-        "pos_distribution": pos_distribution
-    }
@@ -0,0 +1,146 @@
+"""
+Linguistic features from transcriptions with one shared spaCy pipeline.
+
+Only tokens and POS tags are needed, so the model is loaded lazily on first
+use with the parser, NER and lemmatizer disabled, and it is never downloaded
+at runtime. Results are cached per unique transcription (the test repeats the
+same few sentences), and uncached texts are tagged together through nlp.pipe.
+
+Configuration (environment):
+    SPACY_MODEL                 spaCy package to load (default en_core_web_sm)
+    LINGUISTIC_CACHE_SIZE       cached transcriptions (default 4096)
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+LINGUISTIC_CACHE_SIZE = int(os.getenv("LINGUISTIC_CACHE_SIZE", 4096))
+SPACY_DISABLE = ["parser", "ner", "lemmatizer"]
+
+class LinguisticFeatureService:
+    def __init__(self, model: str = SPACY_MODEL, cache_size: int = LINGUISTIC_CACHE_SIZE):
+        self.model = model
+        self.cache_size = cache_size
+        self._nlp = None
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._warm_texts: List[str] = []
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._nlp is not None
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            with self._load_lock:
+                if self._nlp is None:
+                    self._nlp = self._load()
+                    if self._warm_texts:
+                        self.extract_many(self._warm_texts)
+        return self._nlp
+
+    def _load(self):
+        import spacy
+
+        try:
+            return spacy.load(self.model, disable=SPACY_DISABLE)
+        except OSError:
+            # Tokens only (no POS tags) until the model is installed
+            print(f"Warning: spaCy model '{self.model}' not installed "
+                  f"(python -m spacy download {self.model}). POS features disabled.")
+            return spacy.blank("en")
+
+    def register_warm_texts(self, texts: Iterable[str]):
+        """Texts tagged in one batch right after the model loads (e.g. the stimulus sentences)."""
+        self._warm_texts.extend(texts)
+
+    @staticmethod
+    def _features(doc) -> Dict[str, Any]:
+        words = [token for token in doc if not token.is_punct]
+        word_count = len(words)
+        unique_words = len(set([token.text.lower() for token in words]))
+
+        total_chars = sum(len(token.text) for token in words)
+        avg_word_length = total_chars / word_count if word_count > 0 else 0
+
+        lexical_diversity = unique_words / word_count if word_count > 0 else 0
+
+        from spacy.attrs import POS
+
+        pos_counts = doc.count_by(POS)
+        pos_distribution = {doc.vocab[pos].text: count for pos, count in pos_counts.items()}
+
+        return {
+            "word_count": word_count,
+            "unique_words": unique_words,
+            "avg_word_length": avg_word_length,
+            "lexical_diversity": lexical_diversity,
+            "pos_distribution": pos_distribution
+        }
+
+    @staticmethod
+    def _copy(features: Dict[str, Any]) -> Dict[str, Any]:
+        return {**features, "pos_distribution": dict(features["pos_distribution"])}
+
+    def _store(self, text: str, features: Dict[str, Any]):
+        self._cache[text] = features
+        self._cache.move_to_end(text)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def extract_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Features for several texts; uncached unique texts go through one nlp.pipe batch."""
+        unique = [text for text in dict.fromkeys(texts) if text]
+        results: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        with self._lock:
+            for text in unique:
+                cached = self._cache.get(text)
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    self.hits += 1
+                    results[text] = cached
+                else:
+                    self.misses += 1
+                    missing.append(text)
+
+        if missing:
+            nlp = self.nlp
+            computed = {text: self._features(doc) for text, doc in zip(missing, nlp.pipe(missing))}
+            with self._lock:
+                for text, features in computed.items():
+                    self._store(text, features)
+            results.update(computed)
+
+        return [self._copy(results[text]) if text else {} for text in texts]
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        return self.extract_many([text])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model,
+                "loaded": self.loaded,
+                "cached_texts": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+linguistic_service = LinguisticFeatureService()
+
+def extract_linguistic_features(text: str) -> Dict[str, Any]:
+    """
+    Extract linguistic features using spaCy.
+    """
+    if not text:
+        return {}
+    return linguistic_service.extract(text)
@@ -2,39 +2,63 @@
 Improved pause detection using audio analysis instead of relying on Whisper timestamps.
 Uses librosa to detect actual silence/pauses in the audio waveform.
 """
+import logging
 import numpy as np
 import librosa
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Union
 
-def detect_pauses_from_audio(audio_path: str, min_silence_duration: float = 0.3) -> Dict[str, Any]:
+from backend.app.services.speech.audio_context import AudioContext
+
+logger = logging.getLogger(__name__)
+
+# Returned when pause detection fails (not cached)
+PAUSE_ERROR_RESULT = {
+    "avg_pause_duration": 0.0,
+    "max_pause": 0.0,
+    "long_pause_count": 0,
+    "pause_count": 0,
+    "pause_variability": 0.0,
+    "pause_locations": [],
+    "total_pause_time": 0.0
+}
+
+def silent_runs(is_silent: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run-length encode a boolean frame mask.
+
+    Returns:
+        (starts, ends) frame indices of each True run; ends are exclusive
+        (== len(mask) for a run that reaches the end)
+    """
+    edges = np.diff(np.concatenate(([0], is_silent.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def detect_pauses_from_audio(audio: Union[str, AudioContext], min_silence_duration: float = 0.3,
+                             hysteresis_db: float = 0.0) -> Dict[str, Any]:
     """
     Detect pauses by analyzing the audio waveform directly.
 
     Args:
-        audio_path: Path to audio file
+        audio: Path to audio file or an already decoded AudioContext
         min_silence_duration: Minimum duration (seconds) to consider as a pause
+        hysteresis_db: If > 0, dual-threshold mode: a pause is a run of frames
+            below (threshold + hysteresis_db) that dips below the threshold at
+            least once, so energy flicker around the threshold does not split it
 
     Returns:
         Dictionary with pause statistics
     """
-    print(f"\n{'='*70}")
-    print(f"🎵 AUDIO-BASED PAUSE DETECTION STARTING...")
-    print(f"   Audio file: {audio_path}")
-    print(f"   Min silence duration: {min_silence_duration}s")
-    print(f"{'='*70}")
+    logger.debug("Audio-based pause detection: %s (min silence %.2fs)",
+                 getattr(audio, 'source', audio), min_silence_duration)
 
     try:
-        # Load audio
-        print("   Loading audio...")
-        y, sr = librosa.load(audio_path, sr=None)
-        print(f"   ✅ Audio loaded: {len(y)} samples at {sr}Hz ({len(y)/sr:.2f}s)")
+        ctx = AudioContext.ensure(audio)
+        y, sr = ctx.y, ctx.sr
 
         # Calculate RMS energy (volume) over time
         frame_length = int(sr * 0.025)  # 25ms frames
         hop_length = int(sr * 0.010)    # 10ms hop
-
-        print("   Calculating energy...")
-        rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+        rms = ctx.rms(frame_length=frame_length, hop_length=hop_length)
 
         # Convert to dB
         rms_db = librosa.amplitude_to_db(rms, ref=np.max)
@@ -45,46 +69,33 @@ def detect_pauses_from_audio(audio_path: str, min_silence_duration: float = 0.3)
         # Set threshold 10dB above noise floor
         silence_threshold = noise_floor + 10
 
-        print(f"   Noise floor: {noise_floor:.1f}dB")
-        print(f"   Adaptive silence threshold: {silence_threshold:.1f}dB")
-        print(f"   Max energy: {np.max(rms_db):.1f}dB")
-
-        # Find silent frames
+        # Find silent frames and their continuous runs
         is_silent = rms_db < silence_threshold
-        silent_frame_count = np.sum(is_silent)
-        print(f"   Silent frames: {silent_frame_count}/{len(is_silent)} ({silent_frame_count/len(is_silent)*100:.1f}%)")
-
-        # Convert frame indices to time
+        if hysteresis_db > 0:
+            starts, ends = silent_runs(rms_db < silence_threshold + hysteresis_db)
+            if len(starts):
+                # Keep only the loose runs that contain a strictly silent frame
+                hits = np.add.reduceat(is_silent.view(np.int8), starts)
+                starts, ends = starts[hits > 0], ends[hits > 0]
+        else:
+            starts, ends = silent_runs(is_silent)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Audio: %d samples at %dHz (%.2fs); noise floor %.1fdB, threshold %.1fdB, "
+                         "silent frames %d/%d", len(y), sr, len(y) / sr, noise_floor,
+                         silence_threshold, int(is_silent.sum()), len(is_silent))
+
+        # Convert frame indices to time; a run reaching the end stops at the last frame
         times = librosa.frames_to_time(np.arange(len(is_silent)), sr=sr, hop_length=hop_length)
+        start_times = times[starts]
+        end_times = times[np.minimum(ends, len(times) - 1)]
+        durations = end_times - start_times
+        keep = durations >= min_silence_duration
 
-        # Find continuous silent regions
-        pauses = []
-        pause_start = None
-
-        for i, (silent, time) in enumerate(zip(is_silent, times)):
-            if silent and pause_start is None:
-                # Start of pause
-                pause_start = time
-            elif not silent and pause_start is not None:
-                # End of pause
-                pause_duration = time - pause_start
-                if pause_duration >= min_silence_duration:
-                    pauses.append({
-                        'start': pause_start,
-                        'end': time,
-                        'duration': pause_duration
-                    })
-                pause_start = None
-
-        # Handle pause at end of audio
-        if pause_start is not None:
-            pause_duration = times[-1] - pause_start
-            if pause_duration >= min_silence_duration:
-                pauses.append({
-                    'start': pause_start,
-                    'end': times[-1],
-                    'duration': pause_duration
-                })
+        pauses = [
+            {'start': start, 'end': end, 'duration': duration}
+            for start, end, duration in zip(start_times[keep], end_times[keep], durations[keep])
+        ]
 
         if not pauses:
             return {
@@ -96,26 +107,20 @@ def detect_pauses_from_audio(audio_path: str, min_silence_duration: float = 0.3)
                 "total_pause_time": 0.0
             }
 
-        pause_durations = [p['duration'] for p in pauses]
+        pause_durations = durations[keep]
         avg_pause = np.mean(pause_durations)
         max_pause = np.max(pause_durations)
-        long_pause_count = len([p for p in pause_durations if p > 0.8])
+        long_pause_count = int(np.count_nonzero(pause_durations > 0.8))
         total_pause_time = sum(pause_durations)
 
         # Calculate pause variability
         pause_variability = np.std(pause_durations) if len(pause_durations) > 1 else 0.0
 
-        print(f"\n🎵 AUDIO-BASED PAUSE DETECTION:")
-        print(f"   Total pauses detected: {len(pauses)}")
-        print(f"   Avg pause: {avg_pause:.2f}s")
-        print(f"   Max pause: {max_pause:.2f}s")
-        print(f"   Long pauses (>0.8s): {long_pause_count}")
-        print(f"   Pause variability: {pause_variability:.2f}s")
-        print(f"   Total pause time: {total_pause_time:.2f}s")
-
-        # Print each pause
-        for i, pause in enumerate(pauses[:5]):  # Show first 5
-            print(f"   Pause {i+1}: {pause['start']:.2f}s - {pause['end']:.2f}s ({pause['duration']:.2f}s)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Pauses: %d, avg %.2fs, max %.2fs, long (>0.8s) %d, variability %.2fs, total %.2fs",
+                         len(pauses), avg_pause, max_pause, long_pause_count, pause_variability, total_pause_time)
+            for i, pause in enumerate(pauses[:5]):  # Show first 5
+                logger.debug("Pause %d: %.2fs - %.2fs (%.2fs)", i + 1, pause['start'], pause['end'], pause['duration'])
 
         return {
             "avg_pause_duration": float(avg_pause),
@@ -128,16 +133,8 @@ def detect_pauses_from_audio(audio_path: str, min_silence_duration: float = 0.3)
         }
 
     except Exception as e:
-        print(f"❌ Error in audio-based pause detection: {e}")
-        return {
-            "avg_pause_duration": 0.0,
-            "max_pause": 0.0,
-            "long_pause_count": 0,
-            "pause_count": 0,
-            "pause_variability": 0.0,
-            "pause_locations": [],
-            "total_pause_time": 0.0
-        }
+        logger.exception("Error in audio-based pause detection: %s", e)
+        return {**PAUSE_ERROR_RESULT, "pause_locations": []}
 
 
 def analyze_pauses(word_timestamps: List[Any]) -> Dict[str, Any]:
@@ -0,0 +1,66 @@
+"""
+Running per-session aggregates of sentence metrics.
+
+Each analyzed sentence updates a count, sum, mean and Welford M2 (plus
+min/max) per metric, so finalizing a session reads the means and variances
+directly instead of re-walking every sentence result. The state is a plain
+JSON-serializable dict so it can live in any session store backend.
+"""
+import math
+from typing import Any, Dict
+
+# Per-sentence values folded into the session aggregates
+SESSION_METRICS = (
+    "overall_risk",
+    "reaction_time_score",
+    "accuracy_score",
+    "word_accuracy",
+    "reaction_time_ms",
+    "speech_rate_wpm",
+    "avg_pause_duration",
+)
+
+def new_aggregates() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "metrics": {
+            name: {"sum": 0.0, "mean": 0.0, "m2": 0.0, "min": None, "max": None}
+            for name in SESSION_METRICS
+        },
+    }
+
+def add_sentence(aggregates: Dict[str, Any], values: Dict[str, float]):
+    """Fold one sentence's metric values into the aggregates (in place)."""
+    aggregates["count"] += 1
+    n = aggregates["count"]
+    for name, stats in aggregates["metrics"].items():
+        x = float(values.get(name, 0.0))
+        # Welford's update: numerically stable running mean and sum of squared deviations
+        delta = x - stats["mean"]
+        stats["mean"] += delta / n
+        stats["m2"] += delta * (x - stats["mean"])
+        stats["sum"] += x
+        stats["min"] = x if stats["min"] is None else min(stats["min"], x)
+        stats["max"] = x if stats["max"] is None else max(stats["max"], x)
+
+def summarize(aggregates: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Per-metric mean, population variance/std, min and max.
+
+    Returns:
+        {metric: {"mean", "variance", "std", "min", "max"}}; empty if no sentences
+    """
+    n = aggregates["count"]
+    if n == 0:
+        return {}
+    summary = {}
+    for name, stats in aggregates["metrics"].items():
+        variance = max(0.0, stats["m2"] / n)
+        summary[name] = {
+            "mean": stats["sum"] / n,
+            "variance": variance,
+            "std": math.sqrt(variance),
+            "min": stats["min"],
+            "max": stats["max"],
+        }
+    return summary
@@ -2,21 +2,34 @@
 ML-based speech scoring with IMPROVED pause analysis.
 Now properly considers pause duration, variability, and hesitations.
 """
-import joblib
+import threading
 import numpy as np
 from typing import Dict, Any, List
 import os
 
-# Load the trained model
+# The trained model is loaded on first use (or by the startup warm-up)
 MODEL_PATH = "models/speech_ml_model.joblib"
 
-try:
-    ml_model = joblib.load(MODEL_PATH)
-    print(f"✅ Loaded IMPROVED ML model from {MODEL_PATH}")
-    print(f"   Model now emphasizes PAUSE PATTERNS!")
-except FileNotFoundError:
-    print(f"⚠️ ML model not found at {MODEL_PATH}. Please train the model first.")
-    ml_model = None
+ml_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+def get_ml_model():
+    """The trained model, loaded once; None if it has not been trained yet."""
+    global ml_model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                import joblib
+                try:
+                    ml_model = joblib.load(MODEL_PATH)
+                    print(f"✅ Loaded IMPROVED ML model from {MODEL_PATH}")
+                    print(f"   Model now emphasizes PAUSE PATTERNS!")
+                except FileNotFoundError:
+                    print(f"⚠️ ML model not found at {MODEL_PATH}. Please train the model first.")
+                    ml_model = None
+                _model_loaded = True
+    return ml_model
 
 def calculate_pause_features(pause_analysis: Dict[str, Any]) -> Dict[str, float]:
     """
@@ -52,6 +65,90 @@ def calculate_pause_features(pause_analysis: Dict[str, Any]) -> Dict[str, float]
         'hesitation_count': hesitation_count
     }
 
+# Model inputs, in the EXACT order used for training
+FEATURE_NAMES = [
+    'reaction_time_ms', 'speech_rate_wpm', 'avg_pause_duration',
+    'max_pause_duration', 'pause_variability', 'word_accuracy',
+    'long_pause_count', 'hesitation_count'
+]
+
+def build_feature_row(
+    reaction_time_ms: float,
+    speech_rate_wpm: float,
+    pause_analysis: Dict[str, Any],
+    word_accuracy: float
+) -> Dict[str, float]:
+    """One sentence's model inputs by name (see FEATURE_NAMES)."""
+    pause_features = calculate_pause_features(pause_analysis)
+    return {
+        "reaction_time_ms": reaction_time_ms,
+        "speech_rate_wpm": speech_rate_wpm,
+        **pause_features,
+        "word_accuracy": word_accuracy,
+    }
+
+def predict_risk(features: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Score a [n_rows, 8] feature matrix (FEATURE_NAMES order) in one pass.
+
+    predict_proba walks every tree once; the class is its argmax, which is
+    what predict() would have computed with a second pass. Used per sentence,
+    per session and by offline re-scoring of thousands of rows.
+
+    Returns:
+        {"prediction": [n_rows], "probability": [n_rows, n_classes],
+         "risk_probability": [n_rows]}
+    """
+    ml_model = get_ml_model()
+    if ml_model is None:
+        raise RuntimeError(f"ML model not found at {MODEL_PATH}")
+
+    probability = ml_model.predict_proba(np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_NAMES)))
+    return {
+        "prediction": ml_model.classes_[np.argmax(probability, axis=1)],
+        "probability": probability,
+        # Risk probability (probability of cognitive decline)
+        "risk_probability": probability[:, 1],
+    }
+
+def calculate_ml_risk_scores(samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Batched calculate_ml_risk_score: one predict_proba call for all samples.
+
+    Args:
+        samples: dicts with the calculate_ml_risk_score keyword arguments
+            (reaction_time_ms, speech_rate_wpm, pause_analysis, word_accuracy)
+
+    Returns:
+        One result dict per sample, as calculate_ml_risk_score
+    """
+    if not samples:
+        return []
+
+    ml_model = get_ml_model()
+    if ml_model is None:
+        return [
+            fallback_scoring(s["reaction_time_ms"], s["speech_rate_wpm"],
+                             s["pause_analysis"].get("avg_pause_duration", 0), s["word_accuracy"])
+            for s in samples
+        ]
+
+    rows = [build_feature_row(**s) for s in samples]
+    scored = predict_risk(np.array([[row[name] for name in FEATURE_NAMES] for row in rows]))
+
+    # Get feature importances
+    feature_importances = {
+        name: round(imp, 3)
+        for name, imp in zip(FEATURE_NAMES, ml_model.feature_importances_)
+    }
+
+    return [
+        _ml_result(sample, row, prediction, probability, risk_probability, feature_importances)
+        for sample, row, prediction, probability, risk_probability in zip(
+            samples, rows, scored["prediction"], scored["probability"], scored["risk_probability"]
+        )
+    ]
+
 def calculate_ml_risk_score(
     reaction_time_ms: float,
     speech_rate_wpm: float,
@@ -70,32 +167,15 @@ def calculate_ml_risk_score(
     Returns:
         Dictionary with risk score, level, probability, and detailed analysis
     """
+    return calculate_ml_risk_scores([{
+        "reaction_time_ms": reaction_time_ms,
+        "speech_rate_wpm": speech_rate_wpm,
+        "pause_analysis": pause_analysis,
+        "word_accuracy": word_accuracy,
+    }])[0]
 
-    if ml_model is None:
-        return fallback_scoring(reaction_time_ms, speech_rate_wpm,
-                               pause_analysis.get("avg_pause_duration", 0), word_accuracy)
-
-    # Extract advanced pause features
-    pause_features = calculate_pause_features(pause_analysis)
-
-    # Prepare features in the EXACT order as training
-    features = np.array([[
-        reaction_time_ms,
-        speech_rate_wpm,
-        pause_features['avg_pause_duration'],
-        pause_features['max_pause_duration'],
-        pause_features['pause_variability'],
-        word_accuracy,
-        pause_features['long_pause_count'],
-        pause_features['hesitation_count']
-    ]])
-
-    # Get prediction and probability
-    prediction = ml_model.predict(features)[0]
-    probability = ml_model.predict_proba(features)[0]
-
-    # Risk probability (probability of cognitive decline)
-    risk_probability = probability[1]
+def _ml_result(sample, row, prediction, probability, risk_probability, feature_importances) -> Dict[str, Any]:
+    pause_analysis = sample["pause_analysis"]
 
     # Convert to 0-100 scale
     risk_score = risk_probability * 100
@@ -108,22 +188,13 @@ def calculate_ml_risk_score(
     else:
         risk_level = "High"
 
-    # Get feature importances
-    feature_names = [
-        'reaction_time_ms', 'speech_rate_wpm', 'avg_pause_duration',
-        'max_pause_duration', 'pause_variability', 'word_accuracy',
-        'long_pause_count', 'hesitation_count'
-    ]
-
-    feature_importances = ml_model.feature_importances_
-
     # Calculate normalized component scores for display
     component_scores = {
-        'reaction_time_score': min(reaction_time_ms / 30, 100),
-        'speech_rate_score': max(0, 100 - speech_rate_wpm / 1.5),
-        'pause_score': min(pause_features['avg_pause_duration'] * 60, 100),  # Pauses are CRITICAL now
-        'accuracy_score': max(0, 100 - word_accuracy),
-        'hesitation_score': min(pause_features['hesitation_count'] * 15, 100)
+        'reaction_time_score': min(row['reaction_time_ms'] / 30, 100),
+        'speech_rate_score': max(0, 100 - row['speech_rate_wpm'] / 1.5),
+        'pause_score': min(row['avg_pause_duration'] * 60, 100),  # Pauses are CRITICAL now
+        'accuracy_score': max(0, 100 - row['word_accuracy']),
+        'hesitation_score': min(row['hesitation_count'] * 15, 100)
     }
 
     return {
@@ -134,28 +205,16 @@ def calculate_ml_risk_score(
         "confidence": round(max(probability) * 100, 1),
         "component_scores": component_scores,
         "pause_analysis": {
-            "avg_pause_duration": round(pause_features['avg_pause_duration'], 2),
-            "max_pause_duration": round(pause_features['max_pause_duration'], 2),
-            "pause_variability": round(pause_features['pause_variability'], 2),
-            "long_pause_count": pause_features['long_pause_count'],
-            "hesitation_count": pause_features['hesitation_count'],
+            "avg_pause_duration": round(row['avg_pause_duration'], 2),
+            "max_pause_duration": round(row['max_pause_duration'], 2),
+            "pause_variability": round(row['pause_variability'], 2),
+            "long_pause_count": row['long_pause_count'],
+            "hesitation_count": row['hesitation_count'],
             "pause_locations": pause_analysis.get("pause_locations", [])
         },
-        "feature_importances": {
-            name: round(imp, 3)
-            for name, imp in zip(feature_names, feature_importances)
-        },
+        "feature_importances": dict(feature_importances),
         "model_type": "RandomForest_PauseFocused",
-        "features_used": {
-            "reaction_time_ms": reaction_time_ms,
-            "speech_rate_wpm": speech_rate_wpm,
-            "avg_pause_duration": pause_features['avg_pause_duration'],
-            "max_pause_duration": pause_features['max_pause_duration'],
-            "pause_variability": pause_features['pause_variability'],
-            "word_accuracy": word_accuracy,
-            "long_pause_count": pause_features['long_pause_count'],
-            "hesitation_count": pause_features['hesitation_count']
-        }
+        "features_used": {name: row[name] for name in FEATURE_NAMES}
     }
 
 def fallback_scoring(reaction_time_ms, speech_rate_wpm, avg_pause_duration, word_accuracy):
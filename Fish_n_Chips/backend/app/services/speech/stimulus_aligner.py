@@ -0,0 +1,152 @@
+"""
+Stimulus-aware forced alignment for the fixed speech-test sentences.
+
+The test only ever asks for one of a handful of known sentences, so instead of
+open-vocabulary decoding the clip is CTC force-aligned to the expected
+sentence with a small wav2vec2 character model (torchaudio). One encoder pass
+gives per-word timings and per-word match scores; the caller falls back to
+full ASR only when the alignment confidence is low.
+
+Configuration (environment):
+    STIMULUS_ALIGNMENT          auto (use when torchaudio is installed) | on | off
+    ALIGN_MIN_CONFIDENCE        mean word score below which full ASR is used (default 0.6)
+    ALIGN_WORD_THRESHOLD        word score below which a word counts as not produced (default 0.5)
+"""
+import importlib.util
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+
+from backend.app.services.speech.audio_context import AudioContext
+
+STIMULUS_ALIGNMENT = os.getenv("STIMULUS_ALIGNMENT", "auto")
+ALIGN_MIN_CONFIDENCE = float(os.getenv("ALIGN_MIN_CONFIDENCE", 0.6))
+ALIGN_WORD_THRESHOLD = float(os.getenv("ALIGN_WORD_THRESHOLD", 0.5))
+
+# English character CTC model (~95M parameters, runs comfortably on CPU)
+ALIGN_BUNDLE = "WAV2VEC2_ASR_BASE_960H"
+
+@lru_cache(maxsize=1)
+def alignment_available() -> bool:
+    if STIMULUS_ALIGNMENT == "off":
+        return False
+    if STIMULUS_ALIGNMENT == "on":
+        return True
+    # Checked without importing torch, which takes seconds
+    return importlib.util.find_spec("torchaudio") is not None
+
+def _normalize_words(sentence: str) -> List[str]:
+    return re.findall(r"[a-z']+", sentence.lower())
+
+class StimulusAligner:
+    """
+    Lazily loaded CTC aligner. Thread-safe: the model is loaded once and run
+    in inference mode; torch parallelizes each pass internally.
+    """
+
+    def __init__(self, bundle_name: str = ALIGN_BUNDLE):
+        self.bundle_name = bundle_name
+        self._lock = threading.Lock()
+        self.model = None
+        self.sample_rate = None
+        self._label_ids: Dict[str, int] = {}
+
+    def load(self):
+        with self._lock:
+            if self.model is not None:
+                return
+            import torch
+            import torchaudio
+            bundle = getattr(torchaudio.pipelines, self.bundle_name)
+            model = bundle.get_model()
+            model.eval()
+            self._label_ids = {label: i for i, label in enumerate(bundle.get_labels())}
+            self.sample_rate = bundle.sample_rate
+            self._torch = torch
+            self._functional = torchaudio.functional
+            self.model = model
+
+    def align(self, audio: Union[str, AudioContext], sentence: str) -> Optional[Dict[str, Any]]:
+        """
+        Force-align the clip (a path, or the request's decoded AudioContext,
+        resampled to the model rate) to `sentence`.
+
+        Returns:
+            {"text", "words": [{"word", "start", "end", "score"}], "match_score", "confidence"}
+            or None if the sentence cannot be aligned (e.g. clip too short).
+            text keeps only the words whose score passes ALIGN_WORD_THRESHOLD,
+            so it can be compared with the stimulus like an ASR transcript.
+        """
+        self.load()
+        torch = self._torch
+        words = _normalize_words(sentence)
+        if not words:
+            return None
+
+        # Character targets per word ("|" word separators are left to the blank)
+        word_tokens = [[self._label_ids[c] for c in word.upper() if c in self._label_ids] for word in words]
+        if not all(word_tokens):
+            return None
+        targets = [token for tokens in word_tokens for token in tokens]
+
+        y = AudioContext.ensure(audio).resampled(self.sample_rate)
+        waveform = torch.from_numpy(y).unsqueeze(0)
+        with torch.inference_mode():
+            emission, _ = self.model(waveform)
+            emission = torch.log_softmax(emission, dim=-1)
+
+        n_frames = emission.shape[1]
+        if n_frames < len(targets):
+            return None
+
+        try:
+            aligned, scores = self._functional.forced_align(
+                emission, torch.tensor([targets], dtype=torch.int32), blank=0
+            )
+        except RuntimeError:
+            return None
+        spans = self._functional.merge_tokens(aligned[0], scores[0].exp())
+
+        seconds_per_frame = len(y) / n_frames / self.sample_rate
+        aligned_words = []
+        i = 0
+        for word, tokens in zip(words, word_tokens):
+            word_spans = spans[i:i + len(tokens)]
+            i += len(tokens)
+            n = sum(len(span) for span in word_spans)
+            score = sum(span.score * len(span) for span in word_spans) / n
+            aligned_words.append({
+                "word": word,
+                "start": round(word_spans[0].start * seconds_per_frame, 3),
+                "end": round(word_spans[-1].end * seconds_per_frame, 3),
+                "score": round(float(score), 4),
+            })
+
+        confidence = sum(w["score"] for w in aligned_words) / len(aligned_words)
+        matched = [w for w in aligned_words if w["score"] >= ALIGN_WORD_THRESHOLD]
+        return {
+            "text": " ".join(w["word"] for w in matched),
+            "words": aligned_words,
+            "match_score": round(100 * len(matched) / len(aligned_words), 2),
+            "confidence": round(confidence, 4),
+        }
+
+_aligner: Optional[StimulusAligner] = None
+_aligner_lock = threading.Lock()
+
+def get_aligner() -> StimulusAligner:
+    global _aligner
+    with _aligner_lock:
+        if _aligner is None:
+            _aligner = StimulusAligner()
+        return _aligner
+
+def align_to_stimulus(audio: Union[str, AudioContext], sentence: str) -> Optional[Dict[str, Any]]:
+    """Alignment result, or None when alignment failed (caller falls back to ASR)."""
+    try:
+        return get_aligner().align(audio, sentence)
+    except Exception as e:
+        print(f"Stimulus alignment error: {e}")
+        return None
@@ -1,22 +1,78 @@
+import os
 import webrtcvad
 import numpy as np
+from typing import Optional, Union
 
-def detect_speech_start(audio_bytes: bytes, sample_rate: int = 16000) -> float:
+from backend.app.services.speech.audio_context import AudioContext
+
+# Rates and frame sizes accepted by webrtcvad
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+VAD_FRAME_DURATIONS_MS = (10, 20, 30)
+
+# Server-side reaction time settings
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", 30))
+VAD_SMOOTHING_MS = int(os.getenv("VAD_SMOOTHING_MS", 90))
+VAD_MIN_SPEECH_RATIO = 0.8
+
+def speech_frames(pcm: Union[bytes, np.ndarray], sample_rate: int = 16000,
+                  frame_duration_ms: int = 30, aggressiveness: int = 3) -> np.ndarray:
     """
-    Detect the start time of speech in milliseconds using WebRTC VAD.
-    Assumes audio is 16-bit mono PCM.
+    Per-frame speech flags for 16-bit mono PCM.
+    Frames are memoryview slices of the buffer, so nothing is copied.
     """
-    vad = webrtcvad.Vad(3) # Aggressiveness mode 3 (high)
+    if sample_rate not in VAD_SAMPLE_RATES:
+        raise ValueError(f"VAD sample rate must be one of {VAD_SAMPLE_RATES}")
+    if frame_duration_ms not in VAD_FRAME_DURATIONS_MS:
+        raise ValueError(f"VAD frame duration must be one of {VAD_FRAME_DURATIONS_MS} ms")
 
-    # Frame duration in ms (10, 20, or 30ms supported by webrtcvad)
-    frame_duration_ms = 30
+    vad = webrtcvad.Vad(aggressiveness)
+    buffer = memoryview(pcm).cast("B")
     frame_size = int(sample_rate * frame_duration_ms / 1000) * 2 # 2 bytes per sample
+    n_frames = len(buffer) // frame_size
+
+    return np.fromiter(
+        (vad.is_speech(buffer[i * frame_size:(i + 1) * frame_size], sample_rate) for i in range(n_frames)),
+        dtype=bool, count=n_frames
+    )
+
+def smoothed_onset(flags: np.ndarray, window_frames: int = 1, min_ratio: float = VAD_MIN_SPEECH_RATIO) -> Optional[int]:
+    """
+    First speech frame that starts a window of `window_frames` frames of which
+    at least `min_ratio` are speech, so clicks and breaths do not count as onset.
+    """
+    window_frames = max(1, min(window_frames, len(flags)))
+    if not len(flags):
+        return None
+    counts = np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+    in_window = counts[window_frames:] - counts[:-window_frames]
+    needed = int(np.ceil(min_ratio * window_frames))
+    candidates = np.flatnonzero((in_window >= needed) & flags[:len(in_window)])
+    return int(candidates[0]) if len(candidates) else None
 
-    offset = 0
-    while offset + frame_size < len(audio_bytes):
-        frame = audio_bytes[offset:offset + frame_size]
-        if vad.is_speech(frame, sample_rate):
-            return (offset / 2 / sample_rate) * 1000 # Convert bytes offset to ms
-        offset += frame_size
+def detect_speech_start(audio_bytes: Union[bytes, np.ndarray], sample_rate: int = 16000,
+                        frame_duration_ms: int = 30, smoothing_ms: int = 0, aggressiveness: int = 3) -> float:
+    """
+    Detect the start time of speech in milliseconds using WebRTC VAD.
+    Assumes audio is 16-bit mono PCM (bytes or an int16 array).
 
-    return -1.0 # No speech detected
+    smoothing_ms: require speech over this window (see smoothed_onset); 0 = first speech frame
+    """
+    flags = speech_frames(audio_bytes, sample_rate, frame_duration_ms, aggressiveness)
+    onset = smoothed_onset(flags, smoothing_ms // frame_duration_ms)
+    if onset is None:
+        return -1.0 # No speech detected
+    return float(onset * frame_duration_ms)
+
+def detect_speech_onset(audio: Union[str, AudioContext], frame_duration_ms: int = VAD_FRAME_MS,
+                        smoothing_ms: int = VAD_SMOOTHING_MS) -> float:
+    """
+    Speech onset (ms from the start of the clip) on the shared decoded audio;
+    resampled to 16 kHz only when the native rate is not a VAD rate.
+    """
+    try:
+        ctx = AudioContext.ensure(audio)
+        sample_rate = ctx.sr if ctx.sr in VAD_SAMPLE_RATES else 16000
+        return detect_speech_start(ctx.pcm16(sample_rate), sample_rate, frame_duration_ms, smoothing_ms)
+    except Exception as e:
+        print(f"Error in VAD speech onset detection: {e}")
+        return -1.0
@@ -1,46 +1,386 @@
+"""
+Speech transcription with pluggable backends.
+
+Backends (TRANSCRIPTION_BACKEND):
+    openai          OpenAI Whisper API (default)
+    faster-whisper  local CTranslate2 Whisper on CPU, int8 weights
+    whisper.cpp     local whisper.cpp via pywhispercpp
+
+Every backend is loaded once by a warm worker pool (see warm_transcription_pool,
+called at startup). Clips submitted by concurrent requests are queued and each
+worker picks up to TRANSCRIBE_MAX_BATCH of them at a time, so a local model
+runs one batched pass instead of one pass per request.
+
+Configuration (environment):
+    TRANSCRIPTION_BACKEND            openai | faster-whisper | whisper.cpp
+    WHISPER_MODEL                    local model name or path (default base.en)
+    WHISPER_COMPUTE_TYPE             faster-whisper compute type (default int8)
+    WHISPER_CPU_THREADS              threads per local model (0 = library default)
+    TRANSCRIBE_WORKERS               pool workers (default: 8 for openai, 1 per local model)
+    TRANSCRIBE_MAX_BATCH             clips per batched pass (default 8)
+    TRANSCRIBE_MAX_WAIT_MS           how long a worker waits to fill a batch (default 20)
+"""
+import asyncio
 import os
-from openai import OpenAI
-import io
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 
-# Initialize OpenAI client
-# Ensure OPENAI_API_KEY is set in environment
-api_key = os.getenv("OPENAI_API_KEY")
-if api_key:
-    client = OpenAI(api_key=api_key)
-else:
-    print("Warning: OPENAI_API_KEY not found. Whisper service will use dummy data.")
-    client = None
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base.en")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", 0))
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", 0))
+TRANSCRIBE_MAX_BATCH = int(os.getenv("TRANSCRIBE_MAX_BATCH", 8))
+TRANSCRIBE_MAX_WAIT_MS = float(os.getenv("TRANSCRIBE_MAX_WAIT_MS", 20))
 
-def transcribe_with_timestamps(audio_file_path: str):
+# Whisper decodes audio in 30 s windows; longer clips are not batched
+WHISPER_WINDOW_SEC = 30.0
+WHISPER_SAMPLE_RATE = 16000
+
+ERROR_RESULT = {
+    "text": "Error in transcription",
+    "words": []
+}
+
+class TranscriptionBackend(ABC):
     """
-    Transcribe audio file using OpenAI Whisper API and return text with word timestamps.
+    Interface for transcription engines.
+
+    load() is called once per pool worker before any clip is served;
+    transcribe_batch() returns one {"text", "words"} dict per path, where
+    words are {"word", "start", "end"} (seconds).
     """
-    if not client:
-        return {
-            "text": "Dummy transcription (API Key missing)",
-            "words": [
-                {"word": "Dummy", "start": 0.0, "end": 0.5},
-                {"word": "transcription", "start": 0.6, "end": 1.5}
+    name = "base"
+    max_batch = 1
+    default_workers = 1
+
+    def load(self):
+        pass
+
+    @abstractmethod
+    def transcribe(self, audio_file_path: str) -> Dict[str, Any]:
+        ...
+
+    def transcribe_batch(self, audio_file_paths: List[str]) -> List[Dict[str, Any]]:
+        return [self.transcribe(path) for path in audio_file_paths]
+
+class OpenAIBackend(TranscriptionBackend):
+    """OpenAI Whisper API; returns dummy data when OPENAI_API_KEY is not set."""
+    name = "openai"
+    # HTTP-bound: several requests in flight instead of batching
+    default_workers = 8
+
+    def __init__(self):
+        self.client = None
+
+    def load(self):
+        # Ensure OPENAI_API_KEY is set in environment
+        api_key = os.getenv("OPENAI_API_KEY")
+        if api_key:
+            from openai import OpenAI
+            self.client = OpenAI(api_key=api_key)
+        else:
+            print("Warning: OPENAI_API_KEY not found. Whisper service will use dummy data.")
+
+    def transcribe(self, audio_file_path: str) -> Dict[str, Any]:
+        if not self.client:
+            return {
+                "text": "Dummy transcription (API Key missing)",
+                "words": [
+                    {"word": "Dummy", "start": 0.0, "end": 0.5},
+                    {"word": "transcription", "start": 0.6, "end": 1.5}
+                ]
+            }
+
+        try:
+            with open(audio_file_path, "rb") as audio_file:
+                transcript = self.client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=audio_file,
+                    response_format="verbose_json",
+                    timestamp_granularities=["word"]
+                )
+
+            return {
+                "text": transcript.text,
+                "words": transcript.words
+            }
+        except Exception as e:
+            print(f"Whisper API error: {e}")
+            return ERROR_RESULT
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    Local Whisper on CPU via faster-whisper (CTranslate2, int8 by default).
+
+    A batch of short clips is concatenated and decoded with
+    BatchedInferencePipeline, one clip per batch item (clip_timestamps), so
+    the encoder runs once for the whole batch. Word timestamps are shifted
+    back to each clip's own time base.
+    """
+    name = "faster-whisper"
+
+    def __init__(self, model: str = WHISPER_MODEL, compute_type: str = WHISPER_COMPUTE_TYPE,
+                 cpu_threads: int = WHISPER_CPU_THREADS, max_batch: int = TRANSCRIBE_MAX_BATCH):
+        self.model_name = model
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.max_batch = max_batch
+        self.model = None
+        self.pipeline = None
+
+    def load(self):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(self.model_name, device="cpu", compute_type=self.compute_type,
+                                  cpu_threads=self.cpu_threads)
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            self.pipeline = BatchedInferencePipeline(model=self.model)
+        except ImportError:
+            # Older faster-whisper: clips are transcribed one by one
+            self.pipeline = None
+
+    @staticmethod
+    def _result(segments, offset: float = 0.0) -> Dict[str, Any]:
+        text = "".join(segment.text for segment in segments).strip()
+        words = [
+            {"word": word.word.strip(), "start": round(word.start - offset, 3), "end": round(word.end - offset, 3)}
+            for segment in segments for word in (segment.words or [])
+        ]
+        return {"text": text, "words": words}
+
+    def transcribe(self, audio_file_path: str) -> Dict[str, Any]:
+        try:
+            segments, _ = self.model.transcribe(audio_file_path, language="en", beam_size=1,
+                                                word_timestamps=True, vad_filter=False)
+            return self._result(list(segments))
+        except Exception as e:
+            print(f"Local Whisper error: {e}")
+            return ERROR_RESULT
+
+    def transcribe_batch(self, audio_file_paths: List[str]) -> List[Dict[str, Any]]:
+        if self.pipeline is None or len(audio_file_paths) == 1:
+            return super().transcribe_batch(audio_file_paths)
+
+        from faster_whisper import decode_audio
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(audio_file_paths)
+        clips, spans, batch_index = [], [], []
+        offset = 0
+        for i, path in enumerate(audio_file_paths):
+            try:
+                audio = decode_audio(path, sampling_rate=WHISPER_SAMPLE_RATE)
+            except Exception as e:
+                print(f"Local Whisper error: {e}")
+                results[i] = ERROR_RESULT
+                continue
+            if len(audio) > WHISPER_WINDOW_SEC * WHISPER_SAMPLE_RATE:
+                results[i] = self.transcribe(path)
+                continue
+            clips.append(audio)
+            # Sample offsets into the concatenated audio (the pipeline slices audio[start:end])
+            spans.append((offset, offset + len(audio)))
+            batch_index.append(i)
+            offset += len(audio)
+
+        if clips:
+            try:
+                segments, _ = self.pipeline.transcribe(
+                    np.concatenate(clips), language="en", beam_size=1, word_timestamps=True,
+                    vad_filter=False, batch_size=len(clips),
+                    clip_timestamps=[{"start": start, "end": end} for start, end in spans]
+                )
+                segments = list(segments)
+                # Segment times are seconds in the concatenated audio
+                for (start, end), i in zip(spans, batch_index):
+                    start_sec, end_sec = start / WHISPER_SAMPLE_RATE, end / WHISPER_SAMPLE_RATE
+                    own = [s for s in segments if start_sec <= s.start < end_sec]
+                    results[i] = self._result(own, offset=start_sec)
+            except Exception as e:
+                print(f"Local Whisper batch error: {e}")
+                for i in batch_index:
+                    results[i] = self.transcribe(audio_file_paths[i])
+
+        return results
+
+class WhisperCppBackend(TranscriptionBackend):
+    """
+    Local whisper.cpp via pywhispercpp (quantized ggml models).
+    No batching API: clips of a batch run back to back on the warm model.
+    """
+    name = "whisper.cpp"
+
+    def __init__(self, model: str = WHISPER_MODEL, cpu_threads: int = WHISPER_CPU_THREADS):
+        self.model_name = model
+        self.cpu_threads = cpu_threads
+        self.model = None
+
+    def load(self):
+        from pywhispercpp.model import Model
+        kwargs = {"n_threads": self.cpu_threads} if self.cpu_threads else {}
+        self.model = Model(self.model_name, print_realtime=False, print_progress=False, **kwargs)
+
+    def transcribe(self, audio_file_path: str) -> Dict[str, Any]:
+        try:
+            # One segment per word gives word-level timestamps (t0/t1 in 10 ms units)
+            segments = self.model.transcribe(audio_file_path, language="en", token_timestamps=True,
+                                             max_len=1, split_on_word=True)
+            words = [
+                {"word": segment.text.strip(), "start": segment.t0 / 100, "end": segment.t1 / 100}
+                for segment in segments if segment.text.strip()
             ]
-        }
+            return {"text": " ".join(word["word"] for word in words), "words": words}
+        except Exception as e:
+            print(f"whisper.cpp error: {e}")
+            return ERROR_RESULT
 
-    try:
-        with open(audio_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="verbose_json",
-                timestamp_granularities=["word"]
-            )
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    WhisperCppBackend.name: WhisperCppBackend,
+}
 
+def create_backend(name: str = TRANSCRIPTION_BACKEND) -> TranscriptionBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{name}', expected one of {list(BACKENDS)}")
+    return BACKENDS[name]()
+
+class TranscriptionPool:
+    """
+    Warm worker threads, each owning one loaded backend, fed from a shared queue.
+    A worker blocks for the first clip, then collects more for up to
+    max_wait_ms (or until max_batch) and transcribes them in one call.
+    """
+
+    def __init__(self, backend_name: str = TRANSCRIPTION_BACKEND, workers: int = TRANSCRIBE_WORKERS,
+                 max_batch: int = TRANSCRIBE_MAX_BATCH, max_wait_ms: float = TRANSCRIBE_MAX_WAIT_MS):
+        self.backend_name = backend_name
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._ready = threading.Event()
+        self._load_error: Optional[BaseException] = None
+        self.batches = 0
+        self.clips = 0
+
+        first = create_backend(backend_name)
+        n_workers = max(1, workers or first.default_workers)
+        self.backends = [first] + [create_backend(backend_name) for _ in range(n_workers - 1)]
+        self.max_batch = max(1, min(max_batch, self.backends[0].max_batch))
+        self._loaded = 0
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._worker, args=(backend,), name=f"transcribe-{i}", daemon=True)
+            for i, backend in enumerate(self.backends)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _worker(self, backend: TranscriptionBackend):
+        try:
+            backend.load()
+        except BaseException as e:
+            print(f"Failed to load transcription backend '{backend.name}': {e}")
+            self._load_error = e
+            self._ready.set()
+            return
+        with self._lock:
+            self._loaded += 1
+            if self._loaded == len(self.backends):
+                self._ready.set()
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Leave the shutdown marker for this worker's next loop
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            paths = [path for path, _ in batch]
+            try:
+                results = backend.transcribe_batch(paths)
+            except Exception as e:
+                print(f"Transcription error: {e}")
+                results = [ERROR_RESULT] * len(batch)
+            with self._lock:
+                self.batches += 1
+                self.clips += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self._load_error is None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        self._ready.wait(timeout)
+        return self.ready
+
+    def submit(self, audio_file_path: str) -> Future:
+        future: Future = Future()
+        if self._load_error is not None:
+            future.set_result(ERROR_RESULT)
+        else:
+            self._queue.put((audio_file_path, future))
+        return future
+
+    def stats(self) -> Dict[str, Any]:
         return {
-            "text": transcript.text,
-            "words": transcript.words
-        }
-    except Exception as e:
-        print(f"Whisper API error: {e}")
-        # Return dummy data for testing if API fails or key is missing
-        return {
-            "text": "Error in transcription",
-            "words": []
+            "backend": self.backend_name,
+            "workers": len(self.backends),
+            "ready": self.ready,
+            "max_batch": self.max_batch,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "clips": self.clips,
+            "avg_batch_size": round(self.clips / self.batches, 2) if self.batches else 0.0,
         }
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+
+_pool: Optional[TranscriptionPool] = None
+_pool_lock = threading.Lock()
+
+def get_transcription_pool() -> TranscriptionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = TranscriptionPool()
+        return _pool
+
+def warm_transcription_pool() -> TranscriptionPool:
+    """Start the pool and begin loading models (non-blocking). Called at startup."""
+    return get_transcription_pool()
+
+def shutdown_transcription_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+async def transcribe_with_timestamps(audio_file_path: str):
+    """
+    Transcribe audio file with the configured backend and return text with word timestamps.
+    Awaits the clip's batch on the event loop; the pool's workers do the work, so
+    no executor thread is held while the clip is queued or transcribed.
+    """
+    return await asyncio.wrap_future(get_transcription_pool().submit(audio_file_path))
@@ -0,0 +1,168 @@
+"""
+Startup subsystem: deferred model loads, background warm-up and health states.
+
+Importing the app only defines routes; heavy libraries (scipy.signal, pandas,
+openai, spaCy, torchaudio) are imported inside the functions that use them and
+models are loaded by components. Each component loads on first use
+(ensure / ensure_async) or from the background warm-up started by the app
+lifespan, whichever comes first, so a new replica answers /health/live
+immediately and reports /health/ready once its required components are loaded.
+
+Import-time profile:
+    python -m backend.app.startup [module]     # default backend.app.main
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# Set when backend.app.main has finished importing (seconds since interpreter start)
+_process_start = time.perf_counter()
+_app_import_seconds: Optional[float] = None
+
+class Component:
+    """
+    One lazily loaded dependency (a model, a library, a worker pool).
+
+    The loader runs at most once; a failed load is reported (and not retried)
+    so a broken optional model cannot stall every request that touches it.
+    Required components gate readiness, optional ones only report their state.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any], required: bool = True):
+        self.name = name
+        self.loader = loader
+        self.required = required
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.value: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def ensure(self) -> Any:
+        """Load (blocking) if needed and return the loader's result."""
+        if self.state in (READY, FAILED):
+            return self.value
+        with self._lock:
+            if self.state == PENDING:
+                self.state = LOADING
+                start = time.perf_counter()
+                try:
+                    self.value = self.loader()
+                    self.state = READY
+                except Exception as e:
+                    print(f"Failed to load component '{self.name}': {e}")
+                    self.error = str(e)
+                    self.state = FAILED
+                self.load_seconds = round(time.perf_counter() - start, 3)
+        return self.value
+
+    async def ensure_async(self) -> Any:
+        """ensure() without blocking the event loop on a cold component."""
+        if self.state in (READY, FAILED):
+            return self.value
+        return await asyncio.get_running_loop().run_in_executor(None, self.ensure)
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = {"state": self.state, "required": self.required, "load_seconds": self.load_seconds}
+        if self.error:
+            status["error"] = self.error
+        return status
+
+COMPONENTS: Dict[str, Component] = {}
+
+def register_component(name: str, loader: Callable[[], Any], required: bool = True) -> Component:
+    component = Component(name, loader, required)
+    COMPONENTS[name] = component
+    return component
+
+def get_component(name: str) -> Component:
+    return COMPONENTS[name]
+
+_warm_thread: Optional[threading.Thread] = None
+
+def _warm_all(names: List[str]):
+    # Required components first so readiness flips as early as possible
+    for name in sorted(names, key=lambda n: not COMPONENTS[n].required):
+        COMPONENTS[name].ensure()
+
+def warm_up() -> threading.Thread:
+    """Load every registered component in a background thread (non-blocking). Called at startup."""
+    global _warm_thread
+    if _warm_thread is None:
+        _warm_thread = threading.Thread(target=_warm_all, args=(list(COMPONENTS),), name="warm-up", daemon=True)
+        _warm_thread.start()
+    return _warm_thread
+
+def mark_app_imported():
+    global _app_import_seconds
+    _app_import_seconds = round(time.perf_counter() - _process_start, 3)
+
+def liveness() -> Dict[str, Any]:
+    """The process is up and serving; says nothing about models."""
+    return {"status": "alive", "uptime_seconds": round(time.perf_counter() - _process_start, 1)}
+
+def readiness() -> Dict[str, Any]:
+    """Ready once every required component has loaded; per-component states included."""
+    components = {name: component.to_dict() for name, component in COMPONENTS.items()}
+    ready = all(component.ready for component in COMPONENTS.values() if component.required)
+    return {"ready": ready, "components": components}
+
+def startup_report() -> Dict[str, Any]:
+    return {
+        "app_import_seconds": _app_import_seconds,
+        "warm_up_running": _warm_thread is not None and _warm_thread.is_alive(),
+        **readiness(),
+    }
+
+def import_profile(module: str = "backend.app.main", top: int = 25) -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter with -X importtime and summarize.
+
+    Returns total import time and the `top` packages by cumulative time
+    (microseconds), e.g. to check that a change did not pull a heavy library
+    back into the import path.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.getcwd()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+
+    # "import time: <self us> | <cumulative us> | <indented module>"
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(cumulative_us)))
+
+    # Entries at the top of the tree (one leading space) add up to the total
+    total = sum(cumulative for name, cumulative in rows if not name.startswith("  "))
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 1),
+        "modules_imported": len(rows),
+        "heaviest": [{"module": name.strip(), "cumulative_ms": round(us / 1000, 1)} for name, us in heaviest],
+    }
+
+if __name__ == "__main__":
+    report = import_profile(sys.argv[1] if len(sys.argv) > 1 else "backend.app.main")
+    print(f"Import of {report['module']}: {report['total_ms']:.1f} ms, {report['modules_imported']} modules")
+    print(f"{'cumulative':>12s}  module")
+    for row in report["heaviest"]:
+        print(f"{row['cumulative_ms']:10.1f}ms  {row['module']}")
@@ -0,0 +1,144 @@
+"""
+Incremental feature extraction for live EEG streams.
+
+Each connection keeps a ring buffer of the last analysis window. On every hop
+only the new samples are processed: Welch segment PSDs that are still inside
+the window are reused, and the moments come from running power sums, so an
+update costs O(hop) instead of O(window). The resulting feature vector is the
+same one extract_features_batch produces for the current window.
+"""
+import numpy as np
+from collections import deque
+from typing import Optional
+
+from .feature_extraction import features_from_moments
+
+# Recompute the running sums exactly from the ring buffer every N hops to bound drift
+MOMENT_RESYNC_HOPS = 64
+
+class StreamingFeatureExtractor:
+    """
+    Sliding-window feature extractor fed with arbitrary-sized sample blocks.
+
+    Args:
+        n_channels: Channels per sample
+        fs: Sampling rate
+        window_size_sec: Analysis window (same as training segments)
+        hop_sec: Seconds between feature updates; must be a multiple of the
+            Welch segment step (nperseg // 2 = 1 s at the defaults)
+    """
+
+    def __init__(self, n_channels: int = 16, fs: int = 256, window_size_sec: int = 4, hop_sec: int = 1):
+        self.n_channels = n_channels
+        self.fs = fs
+        self.window = window_size_sec * fs
+        self.hop = hop_sec * fs
+        self.nperseg = min(fs * 2, self.window)
+        self.seg_step = self.nperseg // 2  # scipy.signal.welch default overlap
+
+        if self.hop <= 0 or self.hop % self.seg_step:
+            raise ValueError(f"hop must be a positive multiple of {self.seg_step / fs:g}s")
+
+        self._buffer = np.zeros((self.window, n_channels), dtype=np.float64)
+        self._pos = 0            # Next write index in the ring buffer
+        self.n_seen = 0          # Total samples received
+        self._next_update = self.window
+        self._hops = 0
+
+        # Welch segment PSDs inside the current window, keyed by absolute start sample
+        self._segments = deque()
+
+        # Running power sums of (x - shift), per channel
+        self._shift = None
+        self._sums = np.zeros((4, n_channels), dtype=np.float64)
+
+    def _latest(self, n: int) -> np.ndarray:
+        """Last n samples in time order."""
+        idx = (self._pos - n + np.arange(n)) % self.window
+        return self._buffer[idx]
+
+    def _power_sums(self, block: np.ndarray) -> np.ndarray:
+        y = block - self._shift
+        y2 = y * y
+        return np.stack([y.sum(axis=0), y2.sum(axis=0), (y2 * y).sum(axis=0), (y2 * y2).sum(axis=0)])
+
+    def _write(self, block: np.ndarray):
+        n = len(block)
+        idx = (self._pos + np.arange(n)) % self.window
+        # Samples overwritten once the buffer is full fall out of the window
+        n_evicted = min(n, max(0, self.n_seen + n - self.window))
+        if n_evicted:
+            self._sums -= self._power_sums(self._buffer[idx[n - n_evicted:]])
+        self._buffer[idx] = block
+        self._pos = (self._pos + n) % self.window
+        self.n_seen += n
+        self._sums += self._power_sums(block)
+
+    def _update_segments(self):
+        from scipy.signal import welch
+
+        window_start = self.n_seen - self.window
+        while self._segments and self._segments[0][0] < window_start:
+            self._segments.popleft()
+
+        next_start = self._segments[-1][0] + self.seg_step if self._segments else window_start
+        while next_start + self.nperseg <= self.n_seen:
+            offset = self.n_seen - next_start
+            segment = self._latest(offset)[:self.nperseg]
+            _, psd = welch(segment, self.fs, nperseg=self.nperseg, axis=0)
+            self._segments.append((next_start, psd))
+            next_start += self.seg_step
+
+    def _features(self) -> np.ndarray:
+        self._hops += 1
+        if self._hops % MOMENT_RESYNC_HOPS == 0:
+            self._sums = self._power_sums(self._latest(self.window))
+
+        n = float(self.window)
+        s1, s2, s3, s4 = self._sums / n
+        mean = s1
+        m2 = np.maximum(s2 - mean ** 2, 0.0)
+        m3 = s3 - 3 * mean * s2 + 2 * mean ** 3
+        m4 = s4 - 4 * mean * s3 + 6 * mean ** 2 * s2 - 3 * mean ** 4
+
+        psd = np.mean([psd for _, psd in self._segments], axis=0)
+        return features_from_moments(mean + self._shift, m2, m3, m4, self.window, psd, self.fs, self.nperseg)
+
+    def push(self, samples: np.ndarray) -> list:
+        """
+        Feed new samples [n_samples, n_channels].
+
+        Returns:
+            List of (end_sample, feature_vector) for every hop completed by this block.
+        """
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, self.n_channels)
+        if self._shift is None and len(samples):
+            # Shift the running sums by the first sample to limit cancellation from DC offsets
+            self._shift = samples[0].copy()
+
+        updates = []
+        while len(samples):
+            # Never write past the next update point
+            take = min(len(samples), self._next_update - self.n_seen, self.window)
+            self._write(samples[:take])
+            samples = samples[take:]
+
+            if self.n_seen == self._next_update:
+                self._update_segments()
+                updates.append((self.n_seen, self._features()))
+                self._next_update += self.hop
+
+        return updates
+
+    @property
+    def buffered_seconds(self) -> float:
+        return min(self.n_seen, self.window) / self.fs
+
+def decode_sample_frame(frame: bytes, n_channels: int = 16) -> Optional[np.ndarray]:
+    """
+    Binary device frame -> [n_samples, n_channels].
+    Frames are interleaved little-endian float32 samples (row-major).
+    """
+    if len(frame) % (4 * n_channels):
+        return None
+    return np.frombuffer(frame, dtype="<f4").reshape(-1, n_channels)
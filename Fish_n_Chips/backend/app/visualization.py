@@ -0,0 +1,104 @@
+"""
+Compact binary visualization frames for the EEG WebSockets.
+
+Instead of JSON-encoding every raw sample, each chunk is min/max decimated to
+the number of points the client asked for and sent as one binary message.
+
+Frame layout (little-endian):
+    header   '<4sBBHHI'  magic b"EEGV", version, flags, n_points, n_channels, seq
+    scales   float32[n_channels]          int16 encodings only: value = q * scale
+    payload  [n_points, n_channels]       float16 or int16, row-major
+
+Flags: bit 0 set = int16 (otherwise float16), bit 1 set = delta encoding
+(rows after the first hold the difference to the previous row; int16 only).
+"""
+import struct
+import numpy as np
+
+FRAME_MAGIC = b"EEGV"
+FRAME_VERSION = 1
+HEADER = struct.Struct("<4sBBHHI")
+
+FLAG_INT16 = 0x01
+FLAG_DELTA = 0x02
+
+ENCODINGS = ("int16", "float16")
+MAX_POINTS = 4096
+
+def minmax_decimate(data: np.ndarray, n_points: int) -> np.ndarray:
+    """
+    Reduce [n_samples, n_channels] to about n_points rows, keeping the min and
+    max of each bucket in time order so spikes stay visible.
+    """
+    n_samples = data.shape[0]
+    n_buckets = n_points // 2
+    if n_buckets == 0 or n_samples <= n_points:
+        return data
+
+    bucket_len = -(-n_samples // n_buckets)
+    n_buckets = -(-n_samples // bucket_len)
+    padded = np.pad(data, ((0, n_buckets * bucket_len - n_samples), (0, 0)), mode="edge")
+    buckets = padded.reshape(n_buckets, bucket_len, data.shape[1])
+
+    i_min = buckets.argmin(axis=1)
+    i_max = buckets.argmax(axis=1)
+    first = np.where(i_min <= i_max, i_min, i_max)[:, np.newaxis, :]
+    second = np.where(i_min <= i_max, i_max, i_min)[:, np.newaxis, :]
+
+    pairs = np.concatenate([
+        np.take_along_axis(buckets, first, axis=1),
+        np.take_along_axis(buckets, second, axis=1)
+    ], axis=1)
+    return pairs.reshape(-1, data.shape[1])
+
+def encode_viz_frame(data: np.ndarray, seq: int, n_points: int = 256,
+                     encoding: str = "int16", delta: bool = False) -> bytes:
+    """
+    Decimate a [n_samples, n_channels] chunk and pack it as a binary frame.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"encoding must be one of {ENCODINGS}")
+    if delta and encoding != "int16":
+        raise ValueError("delta encoding requires int16")
+
+    decimated = minmax_decimate(np.asarray(data, dtype=np.float32), n_points)
+    n_rows, n_channels = decimated.shape
+    flags = 0
+
+    if encoding == "float16":
+        scales = b""
+        payload = decimated.astype("<f2")
+    else:
+        flags |= FLAG_INT16
+        # Half range in delta mode so row-to-row differences still fit in int16
+        q_max = 16383 if delta else 32767
+        peak = np.abs(decimated).max(axis=0)
+        scale = np.where(peak > 0, peak / q_max, 1.0).astype("<f4")
+        quantized = np.round(decimated / scale).astype(np.int32)
+        if delta:
+            flags |= FLAG_DELTA
+            quantized[1:] = np.diff(quantized, axis=0)
+        scales = scale.tobytes()
+        payload = quantized.astype("<i2")
+
+    header = HEADER.pack(FRAME_MAGIC, FRAME_VERSION, flags, n_rows, n_channels, seq & 0xFFFFFFFF)
+    return header + scales + payload.tobytes()
+
+def decode_viz_frame(frame: bytes) -> np.ndarray:
+    """
+    Inverse of encode_viz_frame (reference implementation for clients).
+    """
+    magic, version, flags, n_rows, n_channels, _ = HEADER.unpack_from(frame)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("Not a visualization frame")
+
+    offset = HEADER.size
+    if not flags & FLAG_INT16:
+        return np.frombuffer(frame, dtype="<f2", offset=offset).reshape(n_rows, n_channels).astype(np.float32)
+
+    scale = np.frombuffer(frame, dtype="<f4", count=n_channels, offset=offset)
+    offset += 4 * n_channels
+    quantized = np.frombuffer(frame, dtype="<i2", offset=offset).reshape(n_rows, n_channels).astype(np.int32)
+    if flags & FLAG_DELTA:
+        quantized = np.cumsum(quantized, axis=0)
+    return quantized * scale
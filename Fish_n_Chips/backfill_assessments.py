@@ -0,0 +1,72 @@
+"""
+Backfill the materialized unified assessments (unified_assessments table).
+
+New results refresh a user's assessment as they are saved; this fills in
+users whose tests predate the table, and recomputes rows that are stale or
+were computed before the scoring changed (ASSESSMENT_LOGIC_VERSION). Creates
+the table if it does not exist.
+
+Usage:
+    python backfill_assessments.py                  # users without an up-to-date assessment
+    python backfill_assessments.py --all            # recompute every user
+    python backfill_assessments.py --user u1 --user u2
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, union
+
+from backend.app.database import AsyncSessionLocal, Base, async_engine
+from backend.app.models.db_models import CognitiveGameSession, EEGTestResult, SpeechTestResult, UnifiedAssessment
+from backend.app.routers.unified_analysis import ASSESSMENT_LOGIC_VERSION, refresh_assessment
+
+async def users_to_refresh(db, refresh_all):
+    """Users with at least one test, minus those with a current assessment (unless refresh_all)"""
+    users = union(
+        select(SpeechTestResult.user_id).where(SpeechTestResult.user_id.is_not(None)),
+        select(CognitiveGameSession.user_id),
+        select(EEGTestResult.user_id),
+    ).subquery()
+    query = select(users.c.user_id)
+    if not refresh_all:
+        current = select(UnifiedAssessment.user_id).where(
+            UnifiedAssessment.computed_version == UnifiedAssessment.version,
+            UnifiedAssessment.logic_version == ASSESSMENT_LOGIC_VERSION,
+        )
+        query = query.where(users.c.user_id.not_in(current))
+    return (await db.scalars(query.order_by(users.c.user_id))).all()
+
+async def backfill(user_ids=None, refresh_all=False, batch_size=100):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[UnifiedAssessment.__table__])
+
+    async with AsyncSessionLocal() as db:
+        if not user_ids:
+            user_ids = await users_to_refresh(db, refresh_all)
+        print(f"Refreshing {len(user_ids)} user(s)")
+
+        start = time.perf_counter()
+        failed = 0
+        for i, user_id in enumerate(user_ids, 1):
+            if not await refresh_assessment(db, user_id):
+                failed += 1
+            # Commit in batches: fewer commits than one per user, without one transaction for the whole run
+            if i % batch_size == 0:
+                await db.commit()
+                print(f"  {i}/{len(user_ids)}")
+        await db.commit()
+        print(f"✅ Refreshed {len(user_ids) - failed} assessment(s) in {time.perf_counter() - start:.1f}s")
+        if failed:
+            print(f"⚠️ {failed} assessment(s) failed and were left stale")
+
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="recompute assessments that are already up to date")
+    parser.add_argument("--user", action="append", dest="users", help="only this user (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(backfill(args.users, args.all, args.batch_size))
@@ -0,0 +1,148 @@
+"""
+Concurrency benchmark for the database layer.
+
+Runs the same request-shaped workload (insert one result row and commit, then
+read the user's completed results, as save_eeg_result / the unified status endpoint
+do) from several processes, each with many concurrent coroutines, against a
+fresh SQLite file in three modes:
+
+    legacy   previous setup: default engine, rollback journal, sync Session on the event loop
+    tuned    WAL/synchronous=NORMAL/mmap/busy-timeout engine, sync Session on the event loop
+    async    same tuning through AsyncSession (aiosqlite), the routers' mode
+
+Reports throughput, latency percentiles, "database is locked" errors and the
+worst event-loop stall seen by a 10 ms ticker (how long other requests on the
+same worker would have waited).
+
+Usage:
+    python benchmark_db.py                           # 4 processes x 16 coroutines x 50 requests
+    python benchmark_db.py --processes 8 --concurrency 32 --requests 100 --modes tuned async
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.database import Base, engine_options, set_sqlite_pragmas
+from backend.app.models.db_models import EEGTestResult
+from backend.app.routers.unified_analysis import user_tests_query
+
+MODES = ("legacy", "tuned", "async")
+
+def make_sessionmaker(mode, path):
+    url = f"sqlite:///{path}"
+    if mode == "legacy":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        return sessionmaker(bind=engine), engine
+    if mode == "tuned":
+        engine = create_engine(url, **engine_options(url))
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        return sessionmaker(bind=engine), engine
+    async_url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(async_url, **engine_options(async_url, asynchronous=True))
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    return async_sessionmaker(engine, expire_on_commit=False), engine
+
+def new_row(user_id):
+    return EEGTestResult(user_id=user_id, status_class=1, probability=0.5, risk_level="Medium",
+                         risk_score=50.0, model_version="bench", completed=True)
+
+async def request_sync(Session, user_id):
+    # What the handlers did before: blocking calls inside `async def`
+    with Session() as db:
+        db.add(new_row(user_id))
+        db.commit()
+        db.execute(user_tests_query(user_id)).all()
+
+async def request_async(Session, user_id):
+    async with Session() as db:
+        db.add(new_row(user_id))
+        await db.commit()
+        (await db.execute(user_tests_query(user_id))).all()
+
+async def ticker(stop, stalls):
+    interval = 0.01
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+async def run_worker(mode, path, worker, concurrency, requests):
+    Session, engine = make_sessionmaker(mode, path)
+    handler = request_async if mode == "async" else request_sync
+    latencies, errors, stalls = [], 0, []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, stalls))
+
+    async def client(c):
+        nonlocal errors
+        user_id = f"user-{worker}-{c}"
+        for _ in range(requests):
+            start = time.perf_counter()
+            try:
+                await handler(Session, user_id)
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                errors += 1
+
+    await asyncio.gather(*(client(c) for c in range(concurrency)))
+    stop.set()
+    await tick
+    if mode == "async":
+        await engine.dispose()
+    else:
+        engine.dispose()
+    return latencies, errors, max(stalls, default=0.0)
+
+def worker_main(args):
+    mode, path, worker, concurrency, requests = args
+    return asyncio.run(run_worker(mode, path, worker, concurrency, requests))
+
+def benchmark(mode, processes, concurrency, requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+
+        start = time.perf_counter()
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes) as pool:
+            results = pool.map(worker_main, [(mode, path, w, concurrency, requests) for w in range(processes)])
+        wall = time.perf_counter() - start
+
+    latencies = np.array([lat for lats, _, _ in results for lat in lats])
+    return {
+        "mode": mode,
+        "ok": len(latencies),
+        "errors": sum(errors for _, errors, _ in results),
+        "throughput": len(latencies) / wall,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000 if len(latencies) else float("nan"),
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000 if len(latencies) else float("nan"),
+        "max_stall_ms": max(stall for _, _, stall in results) * 1000,
+    }
+
+def print_report(rows):
+    print("=" * 78)
+    print(f"{'mode':8s} {'ok':>7s} {'locked':>7s} {'req/s':>9s} {'p50':>10s} {'p95':>10s} {'loop stall':>12s}")
+    print("=" * 78)
+    for r in rows:
+        print(f"{r['mode']:8s} {r['ok']:7d} {r['errors']:7d} {r['throughput']:9.1f} "
+              f"{r['p50_ms']:8.1f}ms {r['p95_ms']:8.1f}ms {r['max_stall_ms']:10.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes x {args.concurrency} coroutines x {args.requests} requests")
+    print_report([benchmark(mode, args.processes, args.concurrency, args.requests) for mode in args.modes])